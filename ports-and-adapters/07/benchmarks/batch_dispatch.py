@@ -0,0 +1,54 @@
+"""
+Reports issues into an SQLite file, first one command at a time through
+MessageBus.handle, then in a single MessageBus.handle_many call that shares
+one unit of work.
+
+    $ python benchmarks/batch_dispatch.py 10000
+"""
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from issues.adapters.orm import SqlAlchemy
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+
+def commands(count):
+    return [
+        ReportIssue(uuid.uuid4(), 'fred', 'fred@example.org', 'halp')
+        for _ in range(count)
+    ]
+
+
+def main(count=10000):
+    path = os.path.join(tempfile.mkdtemp(), 'issues.db')
+    bus = MessageBus()
+    db = SqlAlchemy('sqlite:///' + path, bus)
+    db.configure_mappings()
+    db.create_schema()
+    bus.register(ReportIssue,
+                 lambda cmd: services.report_issue(db.start_unit_of_work, cmd))
+    bus.register_batch(
+        ReportIssue,
+        lambda cmds: services.report_issues(db.start_unit_of_work, cmds))
+
+    cmds = commands(count)
+    began = time.perf_counter()
+    for cmd in cmds:
+        bus.handle(cmd)
+    print("handle      {:>10,.0f} commands/s".format(
+        count / (time.perf_counter() - began)))
+
+    cmds = commands(count)
+    began = time.perf_counter()
+    bus.handle_many(cmds)
+    print("handle_many {:>10,.0f} commands/s".format(
+        count / (time.perf_counter() - began)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
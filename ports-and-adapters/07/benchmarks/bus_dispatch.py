@@ -0,0 +1,40 @@
+"""
+Compares dispatches per second for the class-keyed MessageBus with the
+original bus, which looked handlers up by class name in a defaultdict.
+
+    $ python benchmarks/bus_dispatch.py
+"""
+from collections import defaultdict
+import timeit
+import uuid
+
+from issues.domain.messages import PickIssue
+from issues.domain.ports import MessageBus
+
+
+class NameKeyedMessageBus:
+
+    def __init__(self):
+        self.handlers = defaultdict(list)
+
+    def handle(self, msg):
+        subscribers = self.handlers[type(msg).__name__]
+        for handle in subscribers:
+            handle(msg)
+
+    def register(self, msg, handler, *args):
+        self.handlers[msg.__name__].append(handler)
+
+
+def main(number=1000000):
+    msg = PickIssue(uuid.uuid4(), 'fred@example.org')
+    for bus in (NameKeyedMessageBus(), MessageBus()):
+        bus.register(PickIssue, lambda msg: None)
+        elapsed = min(timeit.repeat(lambda: bus.handle(msg), number=number,
+                                    repeat=3))
+        print("{:<20} {:>12,.0f} dispatches/s".format(
+            type(bus).__name__, number / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Exports a table of issues as NDJSON to /dev/null and prints the peak
+memory allocated by the export for a few table sizes. It should stay flat
+as the table grows.
+
+    $ python benchmarks/export_memory.py 10000 100000
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+import uuid
+
+from issues.adapters import views
+from issues.adapters.orm import SqlAlchemy
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+
+def main(*sizes):
+    for size in sizes or (10000, 100000):
+        path = os.path.join(tempfile.mkdtemp(), 'issues.db')
+        db = SqlAlchemy('sqlite:///' + path, MessageBus())
+        db.configure_mappings()
+        db.create_schema()
+        services.report_issues(db.start_unit_of_work, [
+            ReportIssue(uuid.uuid4(), 'fred', 'fred@example.org', 'halp')
+            for _ in range(size)
+        ])
+        db.remove_session()
+
+        tracemalloc.start()
+        with open(os.devnull, 'w') as out:
+            out.writelines(views.export_issues(db.get_session))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("{:>9,} issues {:>8,.0f} KiB peak".format(size, peak / 1024))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,61 @@
+"""
+Reports issues from several threads against an SQLite file with fully
+synchronous commits, first committing each unit of work on its own and
+then with group commit, and prints the write throughput for each.
+
+    $ python benchmarks/group_commit.py [writers] [seconds]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from issues.adapters.orm import SqlAlchemy, SqliteProfile, GroupCommit
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+
+def run(db, writers, seconds):
+    db.configure_mappings()
+    db.create_schema()
+    counts = [0] * writers
+    stopping = threading.Event()
+
+    def loop(n):
+        while not stopping.is_set():
+            services.report_issue(
+                db.start_unit_of_work,
+                ReportIssue(uuid.uuid4(), 'fred', 'fred@example.org', 'halp'))
+            db.remove_session()
+            counts[n] += 1
+
+    threads = [
+        threading.Thread(target=loop, args=(n, )) for n in range(writers)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stopping.set()
+    for t in threads:
+        t.join()
+    if db.writer is not None:
+        db.writer.stop()
+    return sum(counts) / seconds
+
+
+def main(writers=16, seconds=5):
+    profile = SqliteProfile(synchronous='full', pool_size=writers)
+    for name, group_commit in (('single', None), ('group', GroupCommit())):
+        path = os.path.join(tempfile.mkdtemp(), 'issues.db')
+        db = SqlAlchemy('sqlite:///' + path, MessageBus(),
+                        sqlite_profile=profile,
+                        group_commit=group_commit)
+        print("{:<8} {:>8,.0f} writes/s".format(
+            name, run(db, writers, seconds)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,46 @@
+"""
+Measures IssueRepository.get latency as the issues table grows. With
+issue_id indexed, the cost of a lookup should stay flat.
+
+    $ python benchmarks/issue_lookup.py 1000 10000 100000 1000000 10000000
+"""
+import random
+import sys
+import time
+import uuid
+
+from issues.adapters.orm import SqlAlchemy, issues
+from issues.domain.ports import MessageBus
+
+
+def grow(db, ids, size, chunk=10000):
+    while len(ids) < size:
+        rows = [{
+            'issue_id': uuid.uuid4(),
+            'reporter_name': 'fred',
+            'reporter_email': 'fred@example.org',
+            'description': 'halp'
+        } for _ in range(min(chunk, size - len(ids)))]
+        db.engine.execute(issues.insert(), rows)
+        ids.extend(r['issue_id'] for r in rows)
+
+
+def main(*sizes, lookups=1000):
+    db = SqlAlchemy('sqlite://', MessageBus())
+    db.recreate_schema()
+    ids = []
+    for size in sizes or (1000, 10000, 100000, 1000000):
+        grow(db, ids, size)
+        sample = random.sample(ids, lookups)
+        began = time.perf_counter()
+        for issue_id in sample:
+            with db.start_unit_of_work() as tx:
+                tx.issues.get(issue_id)
+            db.remove_session()
+        elapsed = time.perf_counter() - began
+        print("{:>10,} issues {:8.1f} us/get".format(
+            size, elapsed / lookups * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,42 @@
+"""
+Measures the per-message cost of a compiled pipeline with 0, 2 and 8
+middleware, once with middleware that run and once with middleware that
+are disabled for the message type and so compiled out.
+
+    $ python benchmarks/pipeline_overhead.py
+"""
+import timeit
+import uuid
+
+from issues.domain.messages import PickIssue
+from issues.services import compile_pipeline
+
+
+def passthrough(successor, msg):
+    successor(msg)
+
+
+def disabled(successor, msg):
+    successor(msg)
+
+
+disabled.enabled_for = lambda msg_type: False
+
+
+def handler(msg):
+    pass
+
+
+def main(number=1000000):
+    msg = PickIssue(uuid.uuid4(), 'fred@example.org')
+    for middleware in (passthrough, disabled):
+        for count in (0, 2, 8):
+            run = compile_pipeline(PickIssue, *[middleware] * count, handler)
+            elapsed = min(timeit.repeat(lambda: run(msg), number=number,
+                                        repeat=3))
+            print("{:<12} x{}  {:6.3f} us/message".format(
+                middleware.__name__, count, elapsed / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
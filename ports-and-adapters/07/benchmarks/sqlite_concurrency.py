@@ -0,0 +1,77 @@
+"""
+Runs writer and reader threads against an SQLite file for a few seconds,
+first with SQLAlchemy's defaults and then with the tuned SqliteProfile,
+and reports throughput and errors for each.
+
+    $ python benchmarks/sqlite_concurrency.py [writers] [readers] [seconds]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from issues.adapters import views
+from issues.adapters.orm import SqlAlchemy, SqliteProfile
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+
+def report(db):
+    issue_id = uuid.uuid4()
+    services.report_issue(
+        db.start_unit_of_work,
+        ReportIssue(issue_id, 'fred', 'fred@example.org', 'halp'))
+    return issue_id
+
+
+def run(db, writers, readers, seconds):
+    db.configure_mappings()
+    db.create_schema()
+    ids = [report(db) for _ in range(100)]
+    counts = {'writes': 0, 'reads': 0, 'errors': 0}
+    stopping = threading.Event()
+
+    def loop(work, counter):
+        while not stopping.is_set():
+            try:
+                work()
+                counts[counter] += 1
+            except Exception:
+                counts['errors'] += 1
+            finally:
+                db.remove_session()
+
+    threads = [
+        threading.Thread(target=loop, args=(lambda: report(db), 'writes'))
+        for _ in range(writers)
+    ] + [
+        threading.Thread(
+            target=loop,
+            args=(lambda: views.view_issue(db.get_session, random.choice(ids)),
+                  'reads')) for _ in range(readers)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stopping.set()
+    for t in threads:
+        t.join()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main(writers=4, readers=4, seconds=5):
+    for name, profile in (('default', None), ('tuned', SqliteProfile())):
+        path = os.path.join(tempfile.mkdtemp(), 'issues.db')
+        db = SqlAlchemy('sqlite:///' + path, MessageBus(),
+                        sqlite_profile=profile)
+        result = run(db, writers, readers, seconds)
+        print("{:<8} {writes:>8,.0f} writes/s {reads:>8,.0f} reads/s "
+              "{errors:>6,.0f} errors/s".format(name, **result))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,36 @@
+"""
+Reports issues through the message bus and prints the mean cost of a
+command for each block of commands. If session listeners were leaking, the
+cost per block would climb as the run goes on.
+
+    $ python benchmarks/uow_commit_cost.py 100000
+"""
+import sys
+import time
+import uuid
+
+from issues.adapters.orm import SqlAlchemy
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+
+def main(total=100000, block=10000):
+    bus = MessageBus()
+    db = SqlAlchemy('sqlite://', bus)
+    db.recreate_schema()
+    bus.register(ReportIssue,
+                 lambda cmd: services.report_issue(db.start_unit_of_work, cmd))
+
+    for start in range(0, total, block):
+        began = time.perf_counter()
+        for _ in range(block):
+            bus.handle(
+                ReportIssue(uuid.uuid4(), 'fred', 'fred@example.org', 'halp'))
+        elapsed = time.perf_counter() - began
+        print("commands {:>7}-{:<7} {:8.1f} us/command".format(
+            start, start + block, elapsed / block * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,145 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import inspect
+from itertools import count
+
+from .orm import SqlAlchemy, SqlAlchemyUnitOfWork
+
+
+class DatabaseThreads:
+    """
+    A fixed set of single-threaded executors. A unit of work is pinned to
+    one of them for its whole life, so that its session and connection are
+    only ever used from one thread, which is what SQLite's driver insists on.
+    """
+
+    def __init__(self, threads=4):
+        self._threads = [
+            ThreadPoolExecutor(1, thread_name_prefix='db')
+            for _ in range(threads)
+        ]
+        self._next = count()
+
+    def pick(self):
+        return self._threads[next(self._next) % len(self._threads)]
+
+    def shutdown(self, wait=True):
+        for thread in self._threads:
+            thread.shutdown(wait)
+
+
+class AsyncIssueRepository:
+
+    def __init__(self, uow):
+        self._uow = uow
+
+    async def add(self, issue):
+        await self._uow.run(lambda: self._uow.sync.issues.add(issue))
+
+    async def get(self, issue_id):
+        return await self._uow.run(
+            lambda: self._uow.sync.issues.get(issue_id))
+
+    async def get_many(self, issue_ids):
+        issue_ids = list(issue_ids)
+        return await self._uow.run(
+            lambda: self._uow.sync.issues.get_many(issue_ids))
+
+
+class AsyncSqlAlchemyUnitOfWork:
+    """
+    An asyncio unit of work. Every database call runs on the unit of work's
+    own database thread, using a session that belongs to this unit of work
+    alone, and events are gathered by the same after_flush listener as the
+    sync version. Once committed, events are published on the event loop,
+    so the bus should be an AsyncMessageBus.
+
+    Domain objects should be loaded through `issues` before they're used;
+    touching an attribute that isn't loaded yet would hit the database from
+    the event loop.
+    """
+
+    def __init__(self, sync: SqlAlchemyUnitOfWork, bus, thread):
+        self.sync = sync
+        self.bus = bus
+        self._thread = thread
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._thread, partial(fn, *args))
+
+    async def __aenter__(self):
+        await self.run(self.sync.__enter__)
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        await self.run(self._close)
+        if self.sync.committed and not self.sync.use_outbox:
+            await self.publish_events()
+
+    def _close(self):
+        self.sync.release()
+        self.sync.session.close()
+
+    async def commit(self):
+        await self.run(self.sync.commit)
+
+    async def rollback(self):
+        await self.run(self.sync.rollback)
+
+    async def publish_events(self):
+        for e in self.sync.flushed_events:
+            handled = self.bus.handle(e)
+            if inspect.isawaitable(handled):
+                await handled
+
+    @property
+    def issues(self):
+        return AsyncIssueRepository(self)
+
+
+class AsyncSqlAlchemy:
+    """
+    Wraps a SqlAlchemy for use from asyncio. SQLAlchemy 1.3 has no async
+    engine, so the blocking calls run on a small pool of database threads
+    rather than on the event loop. Those threads each get their own
+    connection, so an in-memory SQLite database won't be shared between
+    them; use a file database.
+    """
+
+    def __init__(self, db: SqlAlchemy, bus, threads=4):
+        self.db = db
+        self.bus = bus
+        self.threads = DatabaseThreads(threads)
+
+    def start_unit_of_work(self):
+        db = self.db
+        retry = db.sqlite_profile.retry if db.sqlite_profile else None
+        uow = SqlAlchemyUnitOfWork(
+            db._session_maker.session_factory,
+            self.bus,
+            db.use_outbox,
+            db.issue_cache,
+            retry,
+            on_write=db._writing,
+            on_commit=db._committed)
+        return AsyncSqlAlchemyUnitOfWork(uow, self.bus, self.threads.pick())
+
+    async def read(self, view, *args):
+        """
+        Runs a sync view on a database thread with a session of its own,
+        which is closed once the view returns.
+        """
+        def run():
+            session = self.db._read_session_maker.session_factory()
+            try:
+                return view(lambda: session, *args)
+            finally:
+                session.close()
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads.pick(), run)
+
+    def shutdown(self):
+        self.threads.shutdown()
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+import threading
+import time
+import uuid
+
+_missing = object()
+
+
+class LRUCache:
+    """
+    A thread-safe cache that holds at most `maxsize` entries, each for at
+    most `ttl` seconds. When it's full, the least recently used entry is
+    evicted. Hits, misses and evictions are counted.
+
+    To avoid caching a value that was read before a concurrent
+    invalidation, read `generation` before loading the value and pass it
+    to `put`; the value is dropped if anything was invalidated meanwhile.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _missing)
+            if entry is _missing:
+                self.misses += 1
+                return default
+            value, expires = entry
+            if expires < self.clock():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class ViewCache:
+    """
+    Caches issue views and pages of the issue list in an LRUCache.
+
+    Each issue has a generation counter that is bumped by `bump` whenever
+    it changes, and any change bumps the list generation; `bump` is added
+    as a commit hook on the database. Entries are keyed by the generation
+    they were read at, so after a bump the old entries are simply never
+    asked for again, and age out of the LRU. A view read before a bump but
+    stored after it is filed under the old generation, so it can't be
+    served stale.
+
+    Generations are themselves kept for at most `maxsize` issues. An issue
+    whose generation is forgotten gets a fresh one, higher than any before.
+    """
+
+    def __init__(self, maxsize=4096, ttl=30.0, clock=time.monotonic):
+        self.entries = LRUCache(maxsize, ttl, clock)
+        self.maxsize = maxsize
+        self._generations = OrderedDict()
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.list_generation = 0
+
+    def bump(self, issue_ids):
+        with self._lock:
+            for issue_id in issue_ids:
+                self._set_generation(uuid.UUID(str(issue_id)))
+            self.list_generation += 1
+
+    def generation(self, issue_id):
+        with self._lock:
+            generation = self._generations.get(issue_id)
+            if generation is None:
+                generation = self._set_generation(issue_id)
+            return generation
+
+    def _set_generation(self, issue_id):
+        self._counter += 1
+        self._generations[issue_id] = self._counter
+        self._generations.move_to_end(issue_id)
+        if len(self._generations) > self.maxsize:
+            self._generations.popitem(last=False)
+        return self._counter
+
+    def issue(self, issue_id, load):
+        """
+        Returns the cached view of an issue, or calls `load` to read it.
+        Views are shared between callers, so don't change them.
+        """
+        issue_id = uuid.UUID(str(issue_id))
+        return self._get(('issue', issue_id, self.generation(issue_id)), load)
+
+    def page(self, key, load):
+        """
+        Returns a cached page of issues for a hashable key, such as the
+        filters and cursor it was listed with, or calls `load` to read it.
+        """
+        return self._get(('list', self.list_generation, key), load)
+
+    def _get(self, key, load):
+        value = self.entries.get(key, _missing)
+        if value is _missing:
+            value = load()
+            self.entries.put(key, value)
+        return value
+
+    def stats(self):
+        return dict(self.entries.stats(), list_generation=self.list_generation)
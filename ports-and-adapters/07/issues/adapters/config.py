@@ -3,6 +3,8 @@ import inspect
 import logging
 
 from . import orm
+from .cache import ViewCache
+from .projections import IssueViewProjection
 
 from .emails import send_to_stdout
 
@@ -14,23 +16,70 @@ from issues.adapters import views
 bus = ports.MessageBus()
 db = orm.SqlAlchemy('sqlite://', bus)
 db.recreate_schema()
+services.metric_recorder.start()
 
 
-def make_pipeline(handler, *args):
-    return services.pipeline(services.logging_handler, services.metric_recorder,
-                             partial(handler, *args))
+def make_pipeline(msg_type, handler, *args):
+    return services.compile_pipeline(msg_type, services.logging_handler,
+                                     services.metric_recorder,
+                                     services.retry_on_conflict,
+                                     partial(handler, *args))
 
 
-bus.register(msg.ReportIssue,
-             make_pipeline(services.report_issue, db.start_unit_of_work))
+# Each pipeline registered below, as (handler list, index, msg_type,
+# handler, args), so that rebuild_pipelines can compile it again.
+pipelines = []
 
-bus.register(msg.TriageIssue,
-             make_pipeline(services.triage_issue, db.start_unit_of_work))
 
-bus.register(msg.PickIssue,
-             make_pipeline(services.pick_issue, db.start_unit_of_work))
+def register(msg_type, handler, *args):
+    bus.register(msg_type, make_pipeline(msg_type, handler, *args))
+    subscribers = bus.handlers[msg_type]
+    pipelines.append((subscribers, len(subscribers) - 1, msg_type, handler,
+                      args))
 
-bus.register(msg.IssueAssignedToEngineer,
-             make_pipeline(services.on_issue_assigned_to_engineer,
-                           partial(views.view_issue, db.get_session),
-                           emails.EmailSender(send_to_stdout)))
+
+def register_batch(msg_type, handler, *args):
+    bus.register_batch(msg_type, make_pipeline(msg_type, handler, *args))
+    subscribers = bus.batch_handlers[msg_type]
+    pipelines.append((subscribers, len(subscribers) - 1, msg_type, handler,
+                      args))
+
+
+def rebuild_pipelines():
+    """
+    Compiles every pipeline again, in place. Middleware is only included if
+    it was enabled when its pipeline was built, so pipelines built before
+    logging was configured, like those built when this module is imported,
+    must be rebuilt to pick up the logging_handler.
+    """
+    for subscribers, index, msg_type, handler, args in pipelines:
+        subscribers[index] = make_pipeline(msg_type, handler, *args)
+    bus.clear_dispatch()
+
+
+register(msg.ReportIssue, services.report_issue, db.start_unit_of_work)
+
+register(msg.TriageIssue, services.triage_issue, db.start_unit_of_work)
+
+register_batch(msg.ReportIssue, services.report_issues, db.start_unit_of_work)
+
+register_batch(msg.TriageIssue, services.triage_issues, db.start_unit_of_work)
+
+register(msg.PickIssue, services.pick_issue, db.start_unit_of_work)
+
+register(msg.AssignIssue, services.assign_issue, db.start_unit_of_work)
+
+# The projection is written in each unit of work's own transaction, and the
+# view cache is only bumped once that has committed, so cached views are
+# only invalidated once there's something newer to read.
+issue_views = IssueViewProjection(db.get_session)
+db.add_write_hook(issue_views.refresh)
+
+view_cache = ViewCache()
+db.add_commit_hook(view_cache.bump)
+
+# The email is sent straight after the assignment is written, before a
+# reader is sure to have caught up, so it reads from the writer.
+register(msg.IssueAssignedToEngineer, services.on_issue_assigned_to_engineer,
+         partial(views.view_issue, db.get_session),
+         emails.EmailSender(send_to_stdout))
@@ -0,0 +1,59 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+from uuid import UUID
+
+# Each worker process builds its own bus when it starts.
+_bus = None
+
+
+def _start_worker(make_bus):
+    global _bus
+    _bus = make_bus()
+
+
+def _handle(cmd):
+    _bus.handle(cmd)
+
+
+def shard_for(issue_id, shards):
+    return UUID(str(issue_id)).int % shards
+
+
+class ShardedExecutor:
+    """
+    Runs commands on a set of worker processes. Each command goes to the
+    worker chosen by hashing its issue_id, and each worker handles its
+    commands one at a time, so commands for the same issue run in the order
+    they were submitted while different issues proceed in parallel.
+
+    `submit` returns a Future that resolves when the command has been
+    handled, or raises whatever the handler raised.
+
+    `make_bus` is called once in each worker to build its MessageBus, so it
+    must be a module-level function (or a partial of one). The workers only
+    share state through the database, so the bus it builds must use a file
+    or server database; an in-memory SQLite database, like the one in
+    `config`, is private to each process.
+    """
+
+    def __init__(self, make_bus, shards=None):
+        shards = shards or os.cpu_count()
+        self._shards = [
+            ProcessPoolExecutor(
+                1, initializer=_start_worker, initargs=(make_bus, ))
+            for _ in range(shards)
+        ]
+
+    def submit(self, cmd):
+        shard = self._shards[shard_for(cmd.issue_id, len(self._shards))]
+        return shard.submit(_handle, cmd)
+
+    def shutdown(self, wait=True):
+        for shard in self._shards:
+            shard.shutdown(wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.shutdown()
@@ -1,15 +1,27 @@
+from concurrent.futures import Future, TimeoutError
+from functools import partial
 import logging
 import uuid
 
-from flask import Flask, request, jsonify
+import click
+from flask import (Flask, Response, request, jsonify,
+                   stream_with_context)
 
 from . import config
 from issues.domain.messages import ReportIssue, AssignIssue, PickIssue
-from issues.adapters.views import view_issue, list_issues
+from issues.domain.ports import (MessageBusOverloaded, IssueNotFoundException,
+                                 ConcurrencyConflict)
+from issues.adapters import views
+from issues.services import metric_recorder
 
 app = Flask('issues')
 bus = config.bus
+
+# How long a request waits for a queued command before answering 202
+# Accepted instead.
+COMMAND_TIMEOUT = 5.0
 db = config.db
+view_cache = config.view_cache
 
 
 @app.before_request
@@ -17,23 +29,120 @@ def get_auth_header():
     request.user = request.headers.get('X-email')
 
 
+def read_session():
+    # With read_your_writes on, a user's reads follow their own writes.
+    return db.get_read_session(request.user)
+
+
+def handle(cmd):
+    """
+    Handles a command and returns True once it has been handled. A
+    QueuedMessageBus hands back a Future, which we wait on for up to
+    COMMAND_TIMEOUT seconds, so that the command's errors reach the client;
+    if it's still queued after that, we return False.
+    """
+    handled = bus.handle(cmd)
+    if isinstance(handled, Future):
+        try:
+            handled.result(COMMAND_TIMEOUT)
+        except TimeoutError:
+            return False
+    db.record_write(request.user)
+    return True
+
+
+@app.errorhandler(MessageBusOverloaded)
+def overloaded(e):
+    return "", 503, {"Retry-After": "1"}
+
+
+@app.errorhandler(IssueNotFoundException)
+def not_found(e):
+    return "", 404
+
+
+@app.errorhandler(ConcurrencyConflict)
+def conflict(e):
+    return "", 409
+
+
 @app.route('/issues', methods=['POST'])
 def report_issue():
     issue_id = uuid.uuid4()
     cmd = ReportIssue(issue_id=issue_id, **request.get_json())
-    bus.handle(cmd)
-    return "", 201, {"Location": "/issues/" + str(issue_id)}
+    status = 201 if handle(cmd) else 202
+    return "", status, {"Location": "/issues/" + str(issue_id)}
+
+
+def with_etag(etag, view, *args, **kwargs):
+    # Cached alongside the view, so a hit needs neither the query nor the
+    # hash.
+    result = view(*args, **kwargs)
+    return result, etag(result)
+
+
+def conditional(view, etag):
+    if request.if_none_match.contains(etag):
+        return "", 304, {"ETag": '"{}"'.format(etag)}
+    response = jsonify(view)
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/issues/<issue_id>')
 def get_issue(issue_id):
-    view = view_issue(db.get_session, uuid.UUID(issue_id))
-    return jsonify(view)
+    issue_id = uuid.UUID(issue_id)
+    view, etag = view_cache.issue(
+        issue_id,
+        partial(with_etag, views.issue_etag, views.view_issue, read_session,
+                issue_id))
+    return conditional(view, etag)
 
 
 @app.route('/issues', methods=['GET'])
 def list_issues():
-    view = list_issues(db.config.get_session)
+    filters = {f: request.args.get(f) for f in views.LIST_FILTERS}
+    filters['after'] = request.args.get('after', 0, type=int)
+    filters['limit'] = request.args.get('limit', 50, type=int)
+    view, etag = view_cache.page(
+        tuple(sorted(filters.items())),
+        partial(with_etag, views.page_etag, views.list_issues, read_session,
+                **filters))
+    return conditional(view, etag)
+
+
+@app.route('/issues/export')
+def export_issues():
+    lines = views.export_issues(read_session)
+    return Response(stream_with_context(lines),
+                    mimetype='application/x-ndjson')
+
+
+@app.cli.command('export-issues')
+@click.argument('output', type=click.File('w'))
+def export_issues_command(output):
+    """Writes every issue to OUTPUT as newline delimited JSON."""
+    output.writelines(views.export_issues(db.get_read_session))
+
+
+@app.cli.command('rebuild-issue-views')
+@click.option('--batch-size', default=500)
+@click.option('--resume', is_flag=True,
+              help="Carry on from the last checkpoint.")
+def rebuild_issue_views(batch_size, resume):
+    """Rebuilds the issue_views projection from the issues tables."""
+    rebuilt = config.issue_views.rebuild(batch_size, resume)
+    click.echo("Rebuilt {} issues".format(rebuilt))
+
+
+@app.route('/metrics')
+def metrics():
+    view = {'messages': metric_recorder.snapshot()}
+    if hasattr(bus, 'metrics'):
+        view['bus'] = bus.metrics()
+    if db.issue_cache is not None:
+        view['issue_cache'] = db.issue_cache.stats()
+    view['view_cache'] = view_cache.stats()
     return jsonify(view)
 
 
@@ -41,12 +150,10 @@ def list_issues():
 def assign_to_engineer(issue_id):
     assign_to = request.args.get('engineer')
     cmd = AssignIssue(issue_id, assign_to, request.user)
-    bus.handle(cmd)
-    return "", 200
+    return "", 200 if handle(cmd) else 202
 
 
 @app.route('/issues/<issue_id>/pick', methods=['POST'])
 def pick_issue(issue_id):
     cmd = PickIssue(issue_id, request.user)
-    bus.handle(cmd)
-    return
+    return "", 200 if handle(cmd) else 202
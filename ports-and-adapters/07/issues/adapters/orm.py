@@ -1,90 +1,655 @@
 import collections
 import logging
+import queue
+import random
+import threading
+import time
 import typing
 import uuid
 
 import sqlalchemy
 from sqlalchemy import (Table, Column, MetaData, String, Integer, Text,
-                        ForeignKey, create_engine, event)
-from sqlalchemy.orm import mapper, scoped_session, sessionmaker, composite, relationship
+                        Boolean, Enum, ForeignKey, Index, create_engine, event)
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+from concurrent.futures import Future
+from sqlalchemy.orm import (mapper, scoped_session, sessionmaker, composite,
+                            relationship, class_mapper,
+                            make_transient_to_detached)
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 import sqlalchemy.exc
+from sqlalchemy.schema import CreateColumn
 import sqlalchemy.orm.exc
 
 from sqlalchemy_utils.functions import create_database, drop_database
 from sqlalchemy_utils.types.uuid import UUIDType
 
+from issues.adapters.cache import LRUCache
+from issues.adapters.serialisation import message_type, serialise
+from issues.domain.messages import IssueState, IssuePriority
 from issues.domain.model import Issue, IssueReporter, Assignment
 from issues.domain.ports import (IssueLog, UnitOfWork, UnitOfWorkManager,
-                                 MessageBus)
+                                 MessageBus, AsyncMessageBus,
+                                 ConcurrencyConflict)
 
 SessionFactory = typing.Callable[[], sqlalchemy.orm.Session]
 
+log = logging.getLogger(__name__)
+
+
+class RetryPolicy(typing.NamedTuple):
+    attempts: int = 5
+    base_delay: float = 0.005
+    max_delay: float = 0.25
+
+    def delays(self):
+        """
+        Exponential backoff with full jitter: before retry n we sleep for a
+        random time of up to base_delay * 2^n, capped at max_delay.
+        """
+        for n in range(self.attempts - 1):
+            ceiling = min(self.max_delay, self.base_delay * 2**n)
+            yield random.uniform(0, ceiling)
+
+
+class GroupCommit(typing.NamedTuple):
+    """
+    Settings for group commit: a writer waits up to `window` seconds after
+    the first commit arrives, or until it has `max_units` units of work, and
+    then commits them all in a single transaction.
+    """
+    window: float = 0.002
+    max_units: int = 64
+
+
+class SqliteProfile(typing.NamedTuple):
+    """
+    Settings for running on an SQLite file in production. WAL lets readers
+    carry on while someone writes, and synchronous=normal only fsyncs at
+    checkpoints. Every pooled connection gets the same pragmas.
+    """
+    journal_mode: str = 'wal'
+    synchronous: str = 'normal'
+    cache_size: int = -64000  # negative values are KiB
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout: int = 5000  # ms
+    pool_size: int = 5
+    max_overflow: int = 10
+    retry: RetryPolicy = RetryPolicy()
+
+
+def create_sqlite_engine(uri, profile: SqliteProfile):
+    if make_url(uri).database in (None, '', ':memory:'):
+        raise ValueError("The SQLite profile needs a database file")
+
+    engine = create_engine(
+        uri,
+        poolclass=QueuePool,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        connect_args={'check_same_thread': False})
+
+    @event.listens_for(engine, 'connect')
+    def configure_connection(dbapi_connection, record):
+        # Stop pysqlite from issuing its own BEGINs, so that we can choose
+        # the kind of transaction in the begin listener below.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode = ' + profile.journal_mode)
+        cursor.execute('PRAGMA synchronous = ' + profile.synchronous)
+        cursor.execute('PRAGMA cache_size = %d' % profile.cache_size)
+        cursor.execute('PRAGMA mmap_size = %d' % profile.mmap_size)
+        cursor.execute('PRAGMA busy_timeout = %d' % profile.busy_timeout)
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def begin(conn):
+        mode = conn.get_execution_options().get('sqlite_begin', 'DEFERRED')
+        conn.execute('BEGIN ' + mode)
+
+    return engine
+
+
+def make_read_only(engine):
+
+    @event.listens_for(engine, 'connect')
+    def query_only(dbapi_connection, record):
+        dbapi_connection.execute('PRAGMA query_only = ON')
+
+
+def is_busy(error):
+    message = str(error.orig)
+    return 'locked' in message or 'busy' in message
+
+
+def take_write_lock(session, retry: RetryPolicy):
+    # Start with BEGIN IMMEDIATE, so that we hold SQLite's write lock
+    # before doing any work. Flush and commit can't then fail with
+    # SQLITE_BUSY, and retrying here is safe since nothing has happened.
+    options = {'sqlite_begin': 'IMMEDIATE'}
+    session.rollback()
+    for delay in retry.delays():
+        try:
+            session.connection(execution_options=options)
+            return
+        except sqlalchemy.exc.OperationalError as e:
+            if not is_busy(e):
+                raise
+            session.rollback()
+            time.sleep(delay)
+    session.connection(execution_options=options)
+
+metadata = MetaData()
+
+issues = Table('issues', metadata,
+               Column('pk', Integer, primary_key=True),
+               Column('issue_id', UUIDType, nullable=False, index=True,
+                      unique=True),
+               Column('reporter_name', String(50)),
+               Column('reporter_email', String(50)),
+               Column('description', Text),
+               Column('assigned_to', String(50)),
+               Column('assigned_by', String(50)),
+               Column('version', Integer, nullable=False, server_default='1'),
+               Column('state', Enum(IssueState), nullable=False,
+                      server_default=IssueState.AwaitingTriage.name),
+               Column('priority', Enum(IssuePriority), nullable=False,
+                      server_default=IssuePriority.NotPrioritised.name),
+               Column('category', String(50)),
+               # Issue lists filter on one of these and page through by pk.
+               Index('ix_issues_state_pk', 'state', 'pk'),
+               Index('ix_issues_priority_pk', 'priority', 'pk'),
+               Index('ix_issues_category_pk', 'category', 'pk'),
+               Index('ix_issues_assigned_to_pk', 'assigned_to', 'pk'))
+
+assignments = Table(
+    'assignments',
+    metadata,
+    Column('pk', Integer, primary_key=True),
+    Column('id', UUIDType),
+    Column('fk_assignment_id', UUIDType, ForeignKey('issues.issue_id'),
+           index=True),
+    Column('assigned_by', String(50)),
+    Column('assigned_to', String(50)),
+)
+
+# Events waiting to be published. Rows are written in the same transaction
+# as the change that raised them, and delivered later by an OutboxRelay.
+outbox = Table(
+    'outbox',
+    metadata,
+    Column('pk', Integer, primary_key=True),
+    Column('message_type', String(255), nullable=False),
+    Column('payload', Text, nullable=False),
+    Column('delivered', Boolean, nullable=False, default=False, index=True),
+)
+
+# A denormalised copy of each issue for views to read. It's kept up to date
+# by IssueViewProjection, and version goes up every time a row changes.
+issue_views = Table(
+    'issue_views',
+    metadata,
+    Column('issue_id', UUIDType, primary_key=True),
+    Column('description', Text),
+    Column('reporter_name', String(50)),
+    Column('reporter_email', String(50)),
+    Column('state', Enum(IssueState), nullable=False,
+           server_default=IssueState.AwaitingTriage.name),
+    Column('priority', Enum(IssuePriority), nullable=False,
+           server_default=IssuePriority.NotPrioritised.name),
+    Column('category', String(50)),
+    Column('assigned_to', String(50)),
+    Column('assigned_by', String(50)),
+    Column('reassignments', Integer, nullable=False, server_default='0'),
+    Column('version', Integer, nullable=False, server_default='1'),
+)
+
+# How far each rebuild has got, so that an interrupted one can resume.
+projection_checkpoints = Table(
+    'projection_checkpoints',
+    metadata,
+    Column('name', String(50), primary_key=True),
+    Column('position', Integer, nullable=False),
+)
+
+
+def take_snapshot(issue):
+    """
+    Copies the column values of a freshly loaded issue, so that it can be
+    cached independently of the session it came from.
+    """
+    return {
+        attr.key: getattr(issue, attr.key)
+        for attr in class_mapper(Issue).column_attrs
+    }
+
+
+def restore_snapshot(session, snapshot):
+    """
+    Rebuilds an issue from a snapshot and attaches it to the session as if
+    it had just been loaded, without touching the database.
+    """
+    issue = class_mapper(Issue).class_manager.new_instance()
+    for key, value in snapshot.items():
+        set_committed_value(issue, key, value)
+    make_transient_to_detached(issue)
+    issue.events = []
+    session.add(issue)
+    return issue
+
+# Data to fill in when upgrade_schema adds a column to an existing table,
+# run in this order; later backfills can rely on the columns filled in by
+# earlier ones.
+BACKFILLS = [
+    (('issues', 'assigned_to'),
+     """UPDATE issues SET
+           assigned_to = (SELECT assigned_to FROM assignments
+                          WHERE fk_assignment_id = issues.issue_id
+                          ORDER BY pk DESC LIMIT 1),
+           assigned_by = (SELECT assigned_by FROM assignments
+                          WHERE fk_assignment_id = issues.issue_id
+                          ORDER BY pk DESC LIMIT 1)"""),
+    # Issues that were already assigned are ready for work, rather than the
+    # AwaitingTriage that the column defaults to.
+    (('issues', 'state'),
+     "UPDATE issues SET state = '{}' WHERE assigned_to IS NOT NULL".format(
+         IssueState.ReadyForWork.name)),
+]
+
 
 class IssueRepository(IssueLog):
 
-    def __init__(self, session):
+    # SQLite allows at most 999 parameters in a statement.
+    chunk_size = 500
+
+    def __init__(self, session, cache=None, written=None):
         self._session = session
+        self._cache = cache
+        self._written = written
 
     def add(self, issue: Issue) -> None:
         self._session.add(issue)
 
     def _get(self, issue_id) -> Issue:
-        return self._session.query(Issue).\
-            filter_by(id=issue_id).\
-            first()
+        if self._cache is None:
+            return self._session.query(Issue).get(issue_id)
+        return self._get_cached(uuid.UUID(str(issue_id)))
+
+    def _get_cached(self, issue_id):
+        # An issue that's already live in this session is always the freshest
+        # copy. Once its transaction has ended it's expired, and the cache is
+        # as good as the database.
+        key = identity_key(Issue, issue_id)
+        existing = self._session.identity_map.get(key)
+        if existing is not None:
+            if not sqlalchemy.inspect(existing).expired:
+                return existing
+            self._session.expunge(existing)
+
+        snapshot = self._cache.get(issue_id)
+        if snapshot is not None:
+            return restore_snapshot(self._session, snapshot)
+
+        generation = self._cache.generation
+        issue = self._session.query(Issue).get(issue_id)
+        if issue is not None:
+            self._cache.put(issue_id, take_snapshot(issue), generation)
+        return issue
+
+    def add_reported(self, cmds):
+        # A single executemany, skipping the session entirely. New issues
+        # have nothing in the cache, and nothing for after_flush to gather,
+        # so we tell the unit of work which issues we wrote ourselves.
+        rows = [{
+            'issue_id': cmd.issue_id,
+            'reporter_name': cmd.reporter_name,
+            'reporter_email': cmd.reporter_email,
+            'description': cmd.problem_description,
+            'version': 1,
+            'state': IssueState.AwaitingTriage
+        } for cmd in cmds]
+        if rows:
+            self._session.execute(issues.insert(), rows)
+            if self._written is not None:
+                self._written.update(row['issue_id'] for row in rows)
+
+    def get_many(self, issue_ids):
+        issue_ids = list(issue_ids)
+        found = {}
+        for start in range(0, len(issue_ids), self.chunk_size):
+            chunk = issue_ids[start:start + self.chunk_size]
+            query = self._session.query(Issue).filter(Issue.id.in_(chunk))
+            for issue in query:
+                found[issue.id] = issue
+        return found
+
+
+# Session listeners are registered once per sessionmaker. Each flush is
+# routed to the unit of work that is currently active on the session; since
+# our sessions are thread-local, that's the unit of work for this thread.
+
+
+def gather_events(session, ctx):
+    uow = session.info.get('unit_of_work')
+    if uow is not None:
+        uow.gather_events(session, ctx)
+
+
+def setup_events(session, entity):
+    entity.events = []
 
 
 class SqlAlchemyUnitOfWork(UnitOfWork):
 
-    def __init__(self, sessionfactory: SessionFactory, bus: MessageBus) -> None:
+    def __init__(self,
+                 sessionfactory: SessionFactory,
+                 bus: MessageBus,
+                 use_outbox: bool = False,
+                 issue_cache=None,
+                 write_lock_retry: RetryPolicy = None,
+                 on_write: typing.Callable[[sqlalchemy.orm.Session, set],
+                                           None] = None,
+                 on_commit: typing.Callable[[set], None] = None,
+                 group_commit: 'GroupCommitWriter' = None) -> None:
         self.sessionfactory = sessionfactory
         self.bus = bus
-        event.listen(self.sessionfactory, "after_flush", self.gather_events)
-        event.listen(self.sessionfactory, "loaded_as_persistent",
-                     self.setup_events)
+        self.use_outbox = use_outbox
+        self.issue_cache = issue_cache
+        self.write_lock_retry = write_lock_retry
+        self.on_write = on_write
+        self.on_commit = on_commit
+        self.group_commit = group_commit
 
     def __enter__(self):
         self.session = self.sessionfactory()
         self.flushed_events = []
+        self.flushed_issues = set()
+        self.committed = False
+        self._outer = self.session.info.get('unit_of_work')
+        self.session.info['unit_of_work'] = self
+        if self.group_commit is not None:
+            # Our changes are written by the group commit writer, so they
+            # mustn't be flushed early into this session's transaction.
+            self._autoflush = self.session.autoflush
+            self.session.autoflush = False
+        elif self.write_lock_retry is not None:
+            take_write_lock(self.session, self.write_lock_retry)
         return self
 
     def __exit__(self, type, value, traceback):
-        self.publish_events()
+        self.release()
+        if not self.committed:
+            # Our session is shared by every unit of work on this thread, so
+            # anything we leave behind would be committed by the next one.
+            # A nested unit of work leaves that to the outer one.
+            if self._outer is None:
+                self.rollback()
+        elif not self.use_outbox:
+            self.publish_events()
+
+    def release(self):
+        self.session.info['unit_of_work'] = self._outer
+        if self.group_commit is not None:
+            self.session.autoflush = self._autoflush
 
     def commit(self):
-        self.session.flush()
+        if self.group_commit is not None:
+            return self.commit_in_group()
+        try:
+            self.session.flush()
+        except sqlalchemy.orm.exc.StaleDataError as e:
+            stale = [i.id for i in self.session.dirty if isinstance(i, Issue)]
+            self.conflict(stale, e)
+        self.before_commit(self.session)
+        self.session.commit()
+        self.committed = True
+        self.after_commit()
+
+    def commit_in_group(self):
+        # Hand our changes over to the writer, and end our own transaction
+        # before waiting so that we don't hold up its commit.
+        changes = list(self.session.new) + list(self.session.dirty)
+        issue_ids = [i.id for i in changes if isinstance(i, Issue)]
+        for obj in changes:
+            self.session.expunge(obj)
         self.session.commit()
+        try:
+            self.group_commit.submit(self, changes).result()
+        except sqlalchemy.orm.exc.StaleDataError as e:
+            self.conflict(issue_ids, e)
+        except Exception:
+            self.rollback()
+            raise
+        self.committed = True
+        self.after_commit()
+
+    def conflict(self, stale, error):
+        # Someone else changed one of our issues since we loaded it, so
+        # whatever we have cached for it is out of date too.
+        self.rollback()
+        if self.issue_cache is not None:
+            for issue_id in stale:
+                self.issue_cache.invalidate(issue_id)
+        raise ConcurrencyConflict() from error
+
+    def before_commit(self, session):
+        # Runs in the transaction that is about to commit our changes, so
+        # anything written here commits, or fails, along with them.
+        if self.on_write is not None:
+            self.on_write(session, self.flushed_issues)
+        if self.use_outbox:
+            self.write_outbox(session)
+
+    def after_commit(self):
+        if self.issue_cache is not None:
+            for issue_id in self.flushed_issues:
+                self.issue_cache.invalidate(issue_id)
+        if self.on_commit is not None:
+            self.on_commit(self.flushed_issues)
+
+    def write_outbox(self, session):
+        if not self.flushed_events:
+            return
+        session.execute(outbox.insert(), [{
+            'message_type': message_type(e),
+            'payload': serialise(e),
+            'delivered': False
+        } for e in self.flushed_events])
 
     def rollback(self):
         self.flushed_events = []
+        self.flushed_issues.clear()
         self.session.rollback()
 
-    def setup_events(self, session, entity):
-        entity.events = []
-
     def gather_events(self, session, ctx):
         flushed_objects = [e for e in session.new] + [e for e in session.dirty]
         for e in flushed_objects:
+            if isinstance(e, Issue):
+                self.flushed_issues.add(e.id)
             try:
                 self.flushed_events += e.events
             except AttributeError:
                 pass
 
     def publish_events(self):
+        # On an AsyncMessageBus we're running in its executor, so handle
+        # would only give us a coroutine that nobody awaits.
+        if isinstance(self.bus, AsyncMessageBus):
+            handle = self.bus.handle_threadsafe
+        else:
+            handle = self.bus.handle
         for e in self.flushed_events:
-            self.bus.handle(e)
+            handle(e)
 
     @property
     def issues(self):
-        return IssueRepository(self.session)
+        return IssueRepository(self.session, self.issue_cache,
+                               self.flushed_issues)
+
+
+class GroupCommitWriter:
+    """
+    Applies units of work on a dedicated thread, committing every unit that
+    arrives within a short window in one transaction, so that a burst of
+    commits costs a single fsync.
+
+    Each unit is flushed inside its own savepoint, so one that fails, say
+    with a stale version, is rolled back on its own and the rest still
+    commit. Each caller's future resolves once the shared transaction is
+    committed, or fails with whatever went wrong for it.
+    """
+
+    def __init__(self,
+                 sessionfactory,
+                 policy: GroupCommit,
+                 write_lock_retry: RetryPolicy = None):
+        self.sessionfactory = sessionfactory
+        self.policy = policy
+        self.write_lock_retry = write_lock_retry
+        self._queue = queue.Queue()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, uow, changes):
+        future = Future()
+        self._queue.put((uow, changes, future))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        # Objects are handed back to their callers once we're done with them,
+        # so they must not be expired by the commit.
+        session = self.sessionfactory(expire_on_commit=False)
+        while not self._stopping:
+            batch = self._next_batch()
+            if batch:
+                self._write(session, batch)
+        session.close()
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            self._stopping = True
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.policy.window
+        while len(batch) < self.policy.max_units:
+            try:
+                unit = self._queue.get(timeout=deadline - time.monotonic())
+            except (queue.Empty, ValueError):
+                break
+            if unit is None:
+                self._stopping = True
+                break
+            batch.append(unit)
+        return batch
+
+    def _write(self, session, batch):
+        try:
+            if self.write_lock_retry is not None:
+                take_write_lock(session, self.write_lock_retry)
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        applied = []
+        for uow, changes, future in batch:
+            try:
+                self._apply(session, uow, changes)
+                applied.append(future)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                session.info['unit_of_work'] = None
+
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            for future in applied:
+                future.set_exception(e)
+        else:
+            for future in applied:
+                future.set_result(None)
+        finally:
+            session.expunge_all()
+
+    def _apply(self, session, uow, changes):
+        with session.begin_nested():
+            for obj in changes:
+                # Units in the same batch can't both have loaded an issue
+                # after the other changed it, so the later one is stale.
+                key = sqlalchemy.inspect(obj).key
+                if key is not None and key in session.identity_map:
+                    raise sqlalchemy.orm.exc.StaleDataError(
+                        "{} was changed by another unit of work".format(obj))
+            session.info['unit_of_work'] = uow
+            session.add_all(changes)
+            session.flush()
+            uow.before_commit(session)
 
 
 class SqlAlchemy:
 
-    def __init__(self, uri, bus):
-        self.engine = create_engine(uri)
+    def __init__(self,
+                 uri,
+                 bus,
+                 use_outbox=False,
+                 issue_cache=None,
+                 sqlite_profile: SqliteProfile = None,
+                 reader_uri=None,
+                 read_your_writes: float = 0,
+                 group_commit: GroupCommit = None):
+        self.sqlite_profile = sqlite_profile
+        self.engine = self._create_engine(uri)
         self.bus = bus
+        self.use_outbox = use_outbox
+        self.issue_cache = issue_cache
         self._session_maker = scoped_session(sessionmaker(self.engine),)
+        event.listen(self._session_maker, "after_flush", gather_events)
+        event.listen(self._session_maker, "loaded_as_persistent",
+                     setup_events)
+
+        # pysqlite's own transaction handling breaks savepoints, so group
+        # commit on SQLite needs the profile's explicit BEGINs.
+        self.writer = None
+        if group_commit is not None:
+            if self.engine.dialect.name == 'sqlite' and sqlite_profile is None:
+                raise ValueError("Group commit on SQLite needs a profile")
+            self.writer = GroupCommitWriter(
+                self._session_maker.session_factory, group_commit,
+                sqlite_profile.retry if sqlite_profile else None)
+
+        # Views read through their own read-only pool when we're given a
+        # reader URI. Read sessions run in autocommit mode, so a long scan
+        # never holds a transaction open. Without a reader URI, reads share
+        # the writer's sessions as before.
+        self.read_your_writes = read_your_writes
+        self._recent_writers = LRUCache(
+            maxsize=10000, ttl=read_your_writes) if read_your_writes else None
+
+        self.write_hooks = []
+        self.commit_hooks = []
+        if reader_uri is None:
+            self.reader_engine = self.engine
+            self._read_session_maker = self._session_maker
+        else:
+            self.reader_engine = self._create_engine(reader_uri)
+            if self.reader_engine.dialect.name == 'sqlite':
+                make_read_only(self.reader_engine)
+            self._read_session_maker = scoped_session(
+                sessionmaker(self.reader_engine, autocommit=True))
+
+    def _create_engine(self, uri):
+        if self.sqlite_profile is None:
+            return create_engine(uri)
+        return create_sqlite_engine(uri, self.sqlite_profile)
 
     def recreate_schema(self):
         self.configure_mappings()
@@ -94,37 +659,131 @@ class SqlAlchemy:
     def get_session(self):
         return self._session_maker()
 
+    def get_read_session(self, client=None):
+        """
+        Returns a session for views. For `read_your_writes` seconds after
+        `record_write(client)`, that client's reads go to the writer so that
+        it sees its own changes. Reads without a client always go to the
+        reader.
+        """
+        if client is not None and self._recent_writers is not None \
+                and self._recent_writers.get(client):
+            return self._session_maker()
+        return self._read_session_maker()
+
+    def remove_session(self):
+        self._session_maker.remove()
+        self._read_session_maker.remove()
+
+    def record_write(self, client):
+        """
+        Notes that `client`, some token that identifies it from one request
+        to the next, has just written. A request is usually handled on a
+        different thread from the one that follows it, so this is keyed by
+        client rather than by thread. Only the most recent writers are
+        remembered, and each for `read_your_writes` seconds.
+        """
+        if self._recent_writers is not None and client is not None:
+            self._recent_writers.put(client, True)
+
+    def add_write_hook(self, hook):
+        """
+        Calls `hook(session, issue_ids)` each time a unit of work writes
+        changes to some issues, with their ids, just before they're
+        committed. Whatever the hook writes through `session` is committed in
+        the same transaction, so it's the place to keep derived data, like
+        projections, in step with the issues. If the hook raises, the unit of
+        work fails. Hooks run in the order they were added.
+        """
+        self.write_hooks.append(hook)
+
+    def add_commit_hook(self, hook):
+        """
+        Calls `hook(issue_ids)` each time a unit of work has committed
+        changes to some issues, before it publishes its events. By then the
+        changes are durable, so a hook that raises is logged and the unit of
+        work carries on. Hooks run in the order they were added.
+        """
+        self.commit_hooks.append(hook)
+
+    def _writing(self, session, issue_ids):
+        if issue_ids:
+            for hook in self.write_hooks:
+                hook(session, issue_ids)
+
+    def _committed(self, issue_ids):
+        if issue_ids:
+            for hook in self.commit_hooks:
+                try:
+                    hook(issue_ids)
+                except Exception:
+                    log.exception("commit hook %r failed", hook)
+
     def start_unit_of_work(self):
-        return SqlAlchemyUnitOfWork(self._session_maker, self.bus)
+        retry = self.sqlite_profile.retry if self.sqlite_profile else None
+        return SqlAlchemyUnitOfWork(
+            self._session_maker,
+            self.bus,
+            self.use_outbox,
+            self.issue_cache,
+            retry,
+            on_write=self._writing,
+            on_commit=self._committed,
+            group_commit=self.writer)
 
     def create_schema(self):
         create_database(self.engine.url)
-        self.metadata.create_all()
+        self.metadata.create_all(self.engine)
+
+    def upgrade_schema(self):
+        """
+        Brings an existing database up to date in place: creates missing
+        tables, adds missing columns and builds missing indexes.
+        """
+        self.configure_mappings()
+        self.metadata.create_all(self.engine)
+        inspector = sqlalchemy.inspect(self.engine)
+        with self.engine.begin() as conn:
+            added = set()
+            for table in self.metadata.sorted_tables:
+                columns = {
+                    c['name'] for c in inspector.get_columns(table.name)
+                }
+                for column in table.columns:
+                    if column.name not in columns:
+                        ddl = CreateColumn(column).compile(
+                            dialect=conn.dialect)
+                        conn.execute('ALTER TABLE {} ADD COLUMN {}'.format(
+                            table.name, ddl))
+                        added.add((table.name, column.name))
+
+                indexes = {
+                    i['name'] for i in inspector.get_indexes(table.name)
+                }
+                for index in table.indexes:
+                    if index.name not in indexes:
+                        index.create(conn)
+
+            for column, backfill in BACKFILLS:
+                if column in added:
+                    conn.execute(backfill)
 
     def configure_mappings(self):
-        self.metadata = MetaData(self.engine)
+        # Tables are shared by every SqlAlchemy instance, but a class can only
+        # be mapped once per process.
+        self.metadata = metadata
+        if sqlalchemy.inspect(Issue, raiseerr=False) is not None:
+            return
 
         IssueReporter.__composite_values__ = lambda i: (i.name, i.email)
-        issues = Table('issues', self.metadata,
-                       Column('pk', Integer, primary_key=True),
-                       Column('issue_id', UUIDType),
-                       Column('reporter_name', String(50)),
-                       Column('reporter_email', String(50)),
-                       Column('description', Text))
-
-        assignments = Table(
-            'assignments',
-            self.metadata,
-            Column('pk', Integer, primary_key=True),
-            Column('id', UUIDType),
-            Column('fk_assignment_id', UUIDType, ForeignKey('issues.issue_id')),
-            Column('assigned_by', String(50)),
-            Column('assigned_to', String(50)),
-        )
 
+        # issue_id is the identity of an Issue, so that Query.get and the
+        # identity map work with the ids that our commands carry.
         mapper(
             Issue,
             issues,
+            primary_key=[issues.c.issue_id],
+            version_id_col=issues.c.version,
             properties={
                 '__pk':
                 issues.c.pk,
@@ -135,8 +794,10 @@ class SqlAlchemy:
                 'reporter':
                 composite(IssueReporter, issues.c.reporter_name,
                           issues.c.reporter_email),
+                # The current assignment lives on the issue itself, so the
+                # history is only loaded when someone asks for it.
                 '_assignments':
-                relationship(Assignment, backref='issue')
+                relationship(Assignment, backref='issue', lazy='dynamic')
             },
         ),
 
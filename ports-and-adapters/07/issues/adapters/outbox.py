@@ -0,0 +1,83 @@
+import logging
+import threading
+
+from sqlalchemy import select
+
+from .orm import outbox
+from .serialisation import deserialise
+
+log = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Delivers events from the outbox table to the message bus.
+
+    Each call to `drain` reads a batch of undelivered rows, oldest first,
+    hands them to the bus and marks them delivered. Rows stay in the table
+    until they are delivered, so a relay that is restarted picks up where
+    the last one stopped. Delivery is at-least-once: an event can be
+    delivered again if the relay stops between handling it and marking it.
+
+    If a handler fails, the rest of the batch is left for the next poll, so
+    events are always delivered in the order they were raised.
+    """
+
+    def __init__(self, make_session, bus, batch_size=100, poll_interval=1.0):
+        self.make_session = make_session
+        self.bus = bus
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def drain(self):
+        session = self.make_session()
+        try:
+            rows = session.execute(
+                select([outbox.c.pk, outbox.c.message_type, outbox.c.payload])
+                .where(outbox.c.delivered == False)  # noqa: E712
+                .order_by(outbox.c.pk)
+                .limit(self.batch_size)).fetchall()
+
+            delivered = []
+            for row in rows:
+                try:
+                    self.bus.handle(deserialise(row.message_type, row.payload))
+                except Exception:
+                    log.exception("Failed to deliver outbox message %s",
+                                  row.pk)
+                    break
+                delivered.append(row.pk)
+
+            if delivered:
+                session.execute(outbox.update()
+                                .where(outbox.c.pk.in_(delivered))
+                                .values(delivered=True))
+            session.commit()
+            return len(delivered)
+        except Exception:
+            session.rollback()
+            raise
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                delivered = self.drain()
+            except Exception:
+                log.exception("Outbox relay failed to read the outbox")
+                delivered = 0
+            if delivered < self.batch_size:
+                self._stopping.wait(self.poll_interval)
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self.run, name='outbox-relay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
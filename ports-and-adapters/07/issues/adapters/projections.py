@@ -0,0 +1,174 @@
+from collections import defaultdict
+
+from sqlalchemy import bindparam, select
+
+from .orm import issues, assignments, issue_views, projection_checkpoints
+
+INSERT_VIEW = issue_views.insert()
+
+REBUILD_VIEW = issue_views.update().where(
+    issue_views.c.issue_id == bindparam('id')).values(
+        description=bindparam('new_description'),
+        reporter_name=bindparam('new_reporter_name'),
+        reporter_email=bindparam('new_reporter_email'),
+        state=bindparam('new_state'),
+        priority=bindparam('new_priority'),
+        category=bindparam('new_category'),
+        assigned_to=bindparam('new_assigned_to'),
+        assigned_by=bindparam('new_assigned_by'),
+        reassignments=bindparam('new_reassignments'),
+        version=issue_views.c.version + 1)
+
+
+def count_reassignments(history):
+    count = 0
+    previous = None
+    for assigned_to in history:
+        if previous is not None and assigned_to != previous:
+            count += 1
+        previous = assigned_to
+    return count
+
+
+class IssueViewProjection:
+    """
+    Maintains the issue_views table, so that viewing an issue is a single
+    row read.
+
+    `refresh` is added as a write hook on the database, so each view is
+    written in the same transaction as the changes to its issue: it commits
+    or fails along with them, and it's up to date before the unit of work
+    publishes its events. Following the commands on the bus instead would
+    depend on the order the bus runs its subscribers in, which an
+    AsyncMessageBus doesn't keep.
+    """
+
+    def __init__(self, make_session):
+        self.make_session = make_session
+
+    def refresh(self, session, issue_ids, batch_size=500):
+        """
+        Brings the views of the given issues up to date with the issues
+        table, through `session` and without committing, `batch_size` issues
+        at a time. Reassignments are counted on from the view's previous
+        assignee, so the assignment history is only read for issues that have
+        no view yet.
+        """
+        issue_ids = list(issue_ids)
+        for start in range(0, len(issue_ids), batch_size):
+            rows = session.execute(
+                select([issues]).where(issues.c.issue_id.in_(
+                    issue_ids[start:start + batch_size]))).fetchall()
+            self._refresh_batch(session, rows)
+
+    def rebuild(self, batch_size=500, resume=False, name='issue_views'):
+        """
+        Rebuilds issue_views from the issues and assignments tables,
+        `batch_size` issues at a time in pk order, and returns the number of
+        issues rebuilt. Each batch is committed with a checkpoint, so a
+        rebuild that is interrupted can carry on where it stopped with
+        `resume=True`.
+        """
+        session = self.make_session()
+        try:
+            if not resume:
+                session.execute(projection_checkpoints.delete().where(
+                    projection_checkpoints.c.name == name))
+            position = session.execute(
+                select([projection_checkpoints.c.position]).where(
+                    projection_checkpoints.c.name == name)).scalar() or 0
+
+            rebuilt = 0
+            while True:
+                rows = session.execute(
+                    select([issues]).where(issues.c.pk > position).order_by(
+                        issues.c.pk).limit(batch_size)).fetchall()
+                if not rows:
+                    break
+                self._rebuild_batch(session, rows)
+                position = rows[-1].pk
+                self._checkpoint(session, name, position)
+                session.commit()
+                rebuilt += len(rows)
+            return rebuilt
+        except Exception:
+            session.rollback()
+            raise
+
+    def _rebuild_batch(self, session, rows):
+        ids = [r.issue_id for r in rows]
+        history = self._history(session, ids)
+        self._write(session, rows, self._views(session, ids), {
+            issue_id: count_reassignments(assigned)
+            for issue_id, assigned in history.items()
+        })
+
+    def _refresh_batch(self, session, rows):
+        views = self._views(session, [r.issue_id for r in rows])
+        history = self._history(
+            session, [r.issue_id for r in rows if r.issue_id not in views])
+        reassignments = {
+            issue_id: count_reassignments(assigned)
+            for issue_id, assigned in history.items()
+        }
+        for r in rows:
+            view = views.get(r.issue_id)
+            if view is not None:
+                reassigned = view.assigned_to is not None \
+                    and view.assigned_to != r.assigned_to
+                reassignments[r.issue_id] = view.reassignments + reassigned
+        self._write(session, rows, views, reassignments)
+
+    def _history(self, session, ids):
+        history = defaultdict(list)
+        if not ids:
+            return history
+        for a in session.execute(
+                select([assignments.c.fk_assignment_id,
+                        assignments.c.assigned_to]).where(
+                            assignments.c.fk_assignment_id.in_(ids)).order_by(
+                                assignments.c.pk)):
+            history[a.fk_assignment_id].append(a.assigned_to)
+        return history
+
+    def _views(self, session, ids):
+        return {
+            r.issue_id: r
+            for r in session.execute(
+                select([issue_views.c.issue_id, issue_views.c.assigned_to,
+                        issue_views.c.reassignments]).where(
+                            issue_views.c.issue_id.in_(ids)))
+        }
+
+    def _write(self, session, rows, existing, reassignments):
+        updates, inserts = [], []
+        for r in rows:
+            view = {
+                'description': r.description,
+                'reporter_name': r.reporter_name,
+                'reporter_email': r.reporter_email,
+                'state': r.state,
+                'priority': r.priority,
+                'category': r.category,
+                'assigned_to': r.assigned_to,
+                'assigned_by': r.assigned_by,
+                'reassignments': reassignments.get(r.issue_id, 0)
+            }
+            if r.issue_id in existing:
+                updates.append(
+                    dict({'new_' + k: v for k, v in view.items()},
+                         id=r.issue_id))
+            else:
+                inserts.append(dict(view, issue_id=r.issue_id))
+
+        if updates:
+            session.execute(REBUILD_VIEW, updates)
+        if inserts:
+            session.execute(INSERT_VIEW, inserts)
+
+    def _checkpoint(self, session, name, position):
+        updated = session.execute(projection_checkpoints.update().where(
+            projection_checkpoints.c.name == name).values(position=position))
+        if not updated.rowcount:
+            session.execute(projection_checkpoints.insert().values(
+                name=name, position=position))
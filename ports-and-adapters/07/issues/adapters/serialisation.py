@@ -0,0 +1,41 @@
+"""
+Turns our NamedTuple messages into JSON and back again, so that they can be
+stored in the outbox table and delivered later.
+"""
+from enum import Enum
+import importlib
+import json
+from uuid import UUID
+
+
+def message_type(msg):
+    cls = type(msg)
+    return '{}:{}'.format(cls.__module__, cls.__qualname__)
+
+
+def serialise(msg):
+    return json.dumps(msg._asdict(), default=_encode)
+
+
+def deserialise(type_name, payload):
+    module, name = type_name.split(':')
+    cls = getattr(importlib.import_module(module), name)
+    hints = getattr(cls, '__annotations__', {})
+    fields = json.loads(payload)
+    return cls(**{k: _decode(hints.get(k), v) for k, v in fields.items()})
+
+
+def _encode(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError("Can't serialise {!r}".format(value))
+
+
+def _decode(hint, value):
+    if value is None or not isinstance(hint, type):
+        return value
+    if issubclass(hint, (UUID, Enum)):
+        return hint(value)
+    return value
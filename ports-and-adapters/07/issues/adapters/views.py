@@ -1,5 +1,10 @@
 import collections
+from functools import partial
+import hashlib
+import json
 import uuid
+
+from sqlalchemy import text
 from .orm import SessionFactory
 from issues.domain import ports
 
@@ -17,17 +22,47 @@ def read_uuid(record, column):
     return record
 
 
+# Issue views read from the issue_views projection, keyed by issue_id.
 FETCH_ISSUE = """SELECT description,
                  reporter_email,
-                 reporter_name
-            FROM issues
+                 reporter_name,
+                 state,
+                 priority,
+                 category,
+                 assigned_to,
+                 assigned_by,
+                 reassignments,
+                 version
+            FROM issue_views
             WHERE issue_id = :id"""
 
-LIST_ISSUES = """SELECT issue_id,
+LIST_ISSUES = """SELECT pk,
+                 issue_id,
+                 description,
+                 reporter_email,
+                 reporter_name,
+                 version
+            FROM issues
+            WHERE {}
+            ORDER BY pk
+            LIMIT :limit"""
+
+# Each of these has an index on (column, pk), so a filtered page is a
+# single range scan however deep into the list it is.
+LIST_FILTERS = ('state', 'priority', 'category', 'assigned_to')
+
+MAX_PAGE_SIZE = 500
+
+EXPORT_ISSUES = text("""SELECT issue_id,
                  description,
                  reporter_email,
-                 reporter_name
-            FROM issues"""
+                 reporter_name,
+                 state,
+                 priority,
+                 category,
+                 assigned_to
+            FROM issues
+            ORDER BY pk""").execution_options(stream_results=True)
 
 
 def view_issue(make_session, id):
@@ -37,13 +72,92 @@ def view_issue(make_session, id):
     return dict(record)
 
 
-def list_issues(make_session, id):
+def list_issues(make_session, after=0, limit=50, **filters):
+    """
+    Returns a page of up to `limit` issues with a pk greater than `after`,
+    and the cursor for the next page, which is None on the last one.
+    Filters are column values, eg. state='ReadyForWork'.
+    """
+    unknown = filters.keys() - set(LIST_FILTERS)
+    if unknown:
+        raise ValueError("Can't filter issues on " + ', '.join(unknown))
+
+    clauses = ['pk > :after']
+    page_size = max(1, min(limit, MAX_PAGE_SIZE))
+    params = {'after': after, 'limit': page_size + 1}
+    for column, value in filters.items():
+        if value is not None:
+            clauses.append('{0} = :{0}'.format(column))
+            # Enums are stored by name.
+            params[column] = getattr(value, 'name', value)
+
     session = make_session()
-    query = session.execute(LIST_ISSUES)
+    query = session.execute(LIST_ISSUES.format(' AND '.join(clauses)), params)
 
     result = []
     for r in query.fetchall():
         r = read_uuid(r, 'issue_id')
         result.append(r)
 
-    return result
+    # We fetch one extra row to find out whether there's another page.
+    next_page = None
+    if len(result) == params['limit']:
+        result.pop()
+        next_page = result[-1]['pk']
+    for r in result:
+        del r['pk']
+
+    return {'issues': result, 'next': next_page}
+
+
+# ETags are worked out from the versions in a view, never from its JSON.
+# An issue view carries its projection row's version; a page of issues is
+# identified by the ids and versions on it, and the cursor that follows.
+
+
+def issue_etag(view):
+    return 'v{}'.format(view['version'])
+
+
+def page_etag(page):
+    digest = hashlib.sha1()
+    for r in page['issues']:
+        digest.update(r['issue_id'].bytes)
+        digest.update(b'%d;' % r['version'])
+    digest.update(str(page['next']).encode())
+    return digest.hexdigest()
+
+
+def export_issues(make_session, chunk_size=1000):
+    """
+    Yields every issue as a line of JSON. Rows are fetched `chunk_size` at
+    a time and written straight out, so memory use stays flat however many
+    issues there are.
+    """
+    encode = json.JSONEncoder().encode
+    result = make_session().execute(EXPORT_ISSUES)
+    keys = [encode(k) + ': ' for k in result.keys()]
+    last = len(keys) - 1
+
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            line = ['{', keys[0], encode(str(uuid.UUID(bytes=row[0])))]
+            for i in range(1, last + 1):
+                line += (', ', keys[i], encode(row[i]))
+            line.append('}\n')
+            yield ''.join(line)
+
+
+# The async views run the same queries on a database thread, and return
+# the same shapes. `db` is an AsyncSqlAlchemy.
+
+
+async def view_issue_async(db, id):
+    return await db.read(view_issue, id)
+
+
+async def list_issues_async(db, **kwargs):
+    return await db.read(partial(list_issues, **kwargs))
@@ -34,13 +34,15 @@ class Issue:
         self.reporter = reporter
         self.state = IssueState.AwaitingTriage
         self.events = []
+        self.assigned_to = None
+        self.assigned_by = None
         self._assignments = []
 
     @property
     def assignment(self):
-        if len(self._assignments) == 0:
+        if self.assigned_to is None:
             return None
-        return self._assignments[-1]
+        return Assignment(self.assigned_to, self.assigned_by)
 
     def triage(self, priority: IssuePriority, category: str) -> None:
         self.priority = priority
@@ -51,11 +53,14 @@ class Issue:
         previous_assignment = self.assignment
         assigned_by = assigned_by or assigned_to
 
-        self._assignments.append(Assignment(assigned_to, assigned_by))
+        assignment = Assignment(assigned_to, assigned_by)
+        self._assignments.append(assignment)
+        self.assigned_to = assigned_to
+        self.assigned_by = assigned_by
 
         self.state = IssueState.ReadyForWork
 
-        if self.assignment.is_reassignment_from(previous_assignment):
+        if assignment.is_reassignment_from(previous_assignment):
             self.events.append(
                 IssueReassigned(self.id, previous_assignment.assigned_to))
 
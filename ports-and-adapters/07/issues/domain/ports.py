@@ -1,14 +1,28 @@
 import abc
+import asyncio
 from collections import defaultdict
+from concurrent.futures import Future
+from functools import partial
+import inspect
+from itertools import groupby
+import logging
+import queue
+import threading
+import time
 from uuid import UUID
+from .messages import ReportIssue
 from .model import Issue
-from typing import Callable, Generic
+from typing import Callable, Dict, Generic, Iterable
 
 
 class IssueNotFoundException(Exception):
     pass
 
 
+class ConcurrencyConflict(Exception):
+    pass
+
+
 class IssueLog(abc.ABC):
 
     @abc.abstractmethod
@@ -25,6 +39,23 @@ class IssueLog(abc.ABC):
             raise IssueNotFoundException()
         return issue
 
+    @abc.abstractmethod
+    def get_many(self, ids: Iterable[UUID]) -> Dict[UUID, Issue]:
+        """
+        Returns the issues with the given ids, keyed by id. Ids that don't
+        match an issue are left out.
+        """
+        pass
+
+    @abc.abstractmethod
+    def add_reported(self, cmds: Iterable[ReportIssue]) -> None:
+        """
+        Adds a new issue for each ReportIssue command. A new issue has no
+        events or history yet, so an implementation can write these straight
+        to storage without building the issues first.
+        """
+        pass
+
 
 class UnitOfWork(abc.ABC):
 
@@ -61,15 +92,279 @@ class CommandAlreadySubscribedException(Exception):
     pass
 
 
+class MessageBusOverloaded(Exception):
+    pass
+
+
 class MessageBus:
 
     def __init__(self):
         self.handlers = defaultdict(list)
+        self.batch_handlers = defaultdict(list)
+        self._dispatch = {}
+        self._batch_dispatch = {}
 
     def handle(self, msg):
-        subscribers = self.handlers[type(msg).__name__]
+        try:
+            subscribers = self._dispatch[type(msg)]
+        except KeyError:
+            subscribers = self.subscribers(type(msg))
         for handle in subscribers:
             handle(msg)
 
+    def subscribers(self, msg_type):
+        """
+        Returns the handlers for a type of message, including those
+        registered against its base classes. The result is worked out once
+        per type and cached until the next call to `register`.
+        """
+        subscribers = tuple(handler
+                            for cls in msg_type.__mro__
+                            for handler in self.handlers.get(cls, ()))
+        self._dispatch[msg_type] = subscribers
+        return subscribers
+
+    def batch_subscribers(self, msg_type):
+        """
+        Returns the batch handlers for a type of message, cached until the
+        next call to `register_batch`. Unlike `subscribers`, these are
+        matched on the exact type: a batch is a run of messages of one type,
+        and a subclass falls back to its own per-message handlers.
+        """
+        subscribers = tuple(self.batch_handlers.get(msg_type, ()))
+        self._batch_dispatch[msg_type] = subscribers
+        return subscribers
+
+    def _batch_subscribers(self, msg_type):
+        try:
+            return self._batch_dispatch[msg_type]
+        except KeyError:
+            return self.batch_subscribers(msg_type)
+
+    def handle_many(self, msgs):
+        """
+        Handles a batch of messages. Consecutive messages of the same type
+        are grouped together; if the type has batch handlers, each of them
+        is called once with the whole group, otherwise we fall back to
+        handling the messages one at a time.
+        """
+        for msg_type, group in groupby(msgs, type):
+            batch_handlers = self._batch_subscribers(msg_type)
+            if batch_handlers:
+                group = list(group)
+                for handle in batch_handlers:
+                    handle(group)
+            else:
+                for msg in group:
+                    self.handle(msg)
+
     def register(self, msg, handler, *args):
-        self.handlers[msg.__name__].append(handler)
+        self.handlers[msg].append(handler)
+        self._dispatch.clear()
+
+    def register_batch(self, msg, handler):
+        self.batch_handlers[msg].append(handler)
+        self._batch_dispatch.clear()
+
+    def clear_dispatch(self):
+        """
+        Forgets the cached subscribers, for when handlers have been replaced
+        in place rather than registered.
+        """
+        self._dispatch.clear()
+        self._batch_dispatch.clear()
+
+
+class QueuedMessageBus(MessageBus):
+    """
+    A MessageBus that hands messages to a pool of worker threads through a
+    bounded queue. `handle` returns a Future for the message as soon as it
+    is queued.
+
+    When the queue is full, `handle` waits up to `timeout` seconds for a
+    free slot and then raises MessageBusOverloaded. A timeout of 0 rejects
+    immediately, and None waits for as long as it takes.
+
+    Messages raised while a worker is handling a message, like the events
+    published by a unit of work, are handled inline on that worker.
+    `teardown` is called by the worker after each message, and is the
+    place to release its thread-local session.
+    """
+
+    def __init__(self, workers=4, maxsize=100, timeout=0, teardown=None):
+        super().__init__()
+        self.queue = queue.Queue(maxsize)
+        self.timeout = timeout
+        self.teardown = teardown
+        self._local = threading.local()
+        self._started = time.perf_counter()
+        self._handled = [0] * workers
+        self._waited = [0.0] * workers
+        self._busy = [0.0] * workers
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(
+                target=self._work, args=(i, ), name='bus-worker-%d' % i,
+                daemon=True) for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def handle(self, msg):
+        if getattr(self._local, 'is_worker', False):
+            return super().handle(msg)
+        return self._enqueue(super().handle, msg)
+
+    def handle_many(self, msgs):
+        """
+        Queues each run of consecutive messages of the same type as a single
+        work item, handled by a worker as MessageBus.handle_many would, and
+        returns a Future for each run. If the queue fills up part way
+        through, the runs already queued are still handled.
+        """
+        if getattr(self._local, 'is_worker', False):
+            return super().handle_many(msgs)
+        handle_many = super().handle_many
+        return [
+            self._enqueue(handle_many, list(group))
+            for _, group in groupby(msgs, type)
+        ]
+
+    def _enqueue(self, handle, msg):
+        future = Future()
+        block = self.timeout != 0
+        try:
+            self.queue.put((handle, msg, time.perf_counter(), future), block,
+                           self.timeout if block else None)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise MessageBusOverloaded()
+        return future
+
+    def _work(self, idx):
+        self._local.is_worker = True
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            handle, msg, queued_at, future = item
+            started = time.perf_counter()
+            error = None
+            try:
+                handle(msg)
+            except Exception as e:
+                logging.exception("Failed to handle %s", type(msg).__name__)
+                error = e
+            finally:
+                if self.teardown is not None:
+                    self.teardown()
+            self._handled[idx] += 1
+            self._waited[idx] += started - queued_at
+            self._busy[idx] += time.perf_counter() - started
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def stop(self):
+        for _ in self._workers:
+            self.queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def metrics(self):
+        handled = sum(self._handled)
+        elapsed = time.perf_counter() - self._started
+        capacity = elapsed * len(self._workers)
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'handled': handled,
+            'rejected': self._rejected,
+            'mean_wait_seconds': sum(self._waited) / handled if handled else 0,
+            'worker_utilisation': sum(self._busy) / capacity,
+        }
+
+
+async def run_in_executor(executor, handler, msg):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, handler, msg)
+
+
+class AsyncMessageBus(MessageBus):
+    """
+    A MessageBus for asyncio. Coroutine handlers are awaited on the event
+    loop, plain handlers are assumed to block and are run in an executor.
+    When a message has several subscribers, they all run concurrently.
+
+    A plain handler that raises messages of its own, like a sync unit of
+    work publishing its events, should use `handle_threadsafe`.
+    """
+
+    def __init__(self, executor=None):
+        super().__init__()
+        self.executor = executor
+        self.loop = None
+
+    def handle_threadsafe(self, msg):
+        """
+        Handles a message from another thread, such as the executor's, on
+        the loop that the bus last ran on, and blocks until it's done.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "handle_threadsafe would block the event loop; await handle")
+        if self.loop is None:
+            raise RuntimeError("The bus hasn't run on an event loop yet")
+        return asyncio.run_coroutine_threadsafe(self.handle(msg),
+                                                self.loop).result()
+
+    async def handle(self, msg):
+        self.loop = asyncio.get_running_loop()
+        try:
+            subscribers = self._dispatch[type(msg)]
+        except KeyError:
+            subscribers = self.subscribers(type(msg))
+        if len(subscribers) == 1:
+            await subscribers[0](msg)
+        elif subscribers:
+            await asyncio.gather(*(handle(msg) for handle in subscribers))
+
+    async def handle_many(self, msgs):
+        self.loop = asyncio.get_running_loop()
+        for msg_type, group in groupby(msgs, type):
+            batch_handlers = self._batch_subscribers(msg_type)
+            if len(batch_handlers) == 1:
+                await batch_handlers[0](list(group))
+            elif batch_handlers:
+                group = list(group)
+                await asyncio.gather(
+                    *(handle(group) for handle in batch_handlers))
+            else:
+                for msg in group:
+                    await self.handle(msg)
+
+    def _offload(self, handler):
+        if inspect.iscoroutinefunction(handler):
+            return handler
+        return partial(run_in_executor, self.executor, handler)
+
+    def subscribers(self, msg_type):
+        subscribers = tuple(
+            self._offload(handler)
+            for handler in super().subscribers(msg_type))
+        self._dispatch[msg_type] = subscribers
+        return subscribers
+
+    def batch_subscribers(self, msg_type):
+        subscribers = tuple(
+            self._offload(handler)
+            for handler in super().batch_subscribers(msg_type))
+        self._batch_dispatch[msg_type] = subscribers
+        return subscribers
@@ -1,7 +1,9 @@
 from collections import namedtuple
+import logging
 
 from issues.domain.ports import IssueLog, UnitOfWorkManager, UnitOfWork
 from issues.domain.emails import EmailSender
+from issues.services import new_issue
 
 
 class FakeIssueLog(IssueLog):
@@ -17,6 +19,13 @@ class FakeIssueLog(IssueLog):
             if issue.id == id:
                 return issue
 
+    def get_many(self, ids):
+        ids = set(ids)
+        return {issue.id: issue for issue in self.issues if issue.id in ids}
+
+    def add_reported(self, cmds):
+        self.issues.extend(new_issue(cmd) for cmd in cmds)
+
     def __len__(self):
         return len(self.issues)
 
@@ -63,3 +72,13 @@ def fake_sender(sent):
         sent.append(sent_mail(recipient, sent_mail, subject, body))
 
     return send
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
@@ -0,0 +1,100 @@
+import asyncio
+from collections import namedtuple
+from functools import partial
+import threading
+
+from issues.domain.ports import AsyncMessageBus
+from issues.services import async_pipeline
+
+from expects import expect, equal, be_true
+
+Ping = namedtuple('Ping', ['payload'])
+Pong = namedtuple('Pong', ['payload'])
+
+
+class When_an_event_has_several_async_subscribers:
+
+    def given_two_subscribers_that_wait_for_each_other(self):
+        self.bus = AsyncMessageBus()
+        self.handled = []
+
+        async def subscriber(name, mine, theirs, msg):
+            mine.set()
+            await theirs.wait()
+            self.handled.append(name)
+
+        async def run():
+            first, second = asyncio.Event(), asyncio.Event()
+            self.bus.register(Ping, partial(subscriber, 'a', first, second))
+            self.bus.register(Ping, partial(subscriber, 'b', second, first))
+            await asyncio.wait_for(self.bus.handle(Ping(1)), 1)
+
+        self.run = run
+
+    def because_we_handle_the_event(self):
+        asyncio.run(self.run())
+
+    def it_should_run_the_subscribers_concurrently(self):
+        expect(sorted(self.handled)).to(equal(['a', 'b']))
+
+
+class When_a_plain_handler_is_registered_on_the_async_bus:
+
+    def given_a_blocking_handler(self):
+        self.bus = AsyncMessageBus()
+        self.threads = []
+        self.bus.register(
+            Ping, lambda msg: self.threads.append(threading.get_ident()))
+
+    def because_we_handle_a_message(self):
+        asyncio.run(self.bus.handle(Ping(1)))
+
+    def it_should_run_the_handler_off_the_event_loop_thread(self):
+        expect(self.threads[0] != threading.get_ident()).to(be_true)
+
+
+class When_an_async_pipeline_wraps_a_plain_handler:
+
+    def given_an_async_middleware(self):
+        self.calls = []
+
+        async def middleware(successor, msg):
+            self.calls.append('before')
+            await successor(msg)
+            self.calls.append('after')
+
+        self.bus = AsyncMessageBus()
+        self.bus.register(
+            Ping,
+            async_pipeline(middleware,
+                           lambda msg: self.calls.append(msg.payload)))
+
+    def because_we_handle_a_message(self):
+        asyncio.run(self.bus.handle(Ping('handled')))
+
+    def it_should_run_the_middleware_around_the_handler(self):
+        expect(self.calls).to(equal(['before', 'handled', 'after']))
+
+
+class When_the_async_bus_handles_a_batch:
+
+    def given_a_batch_handler_and_a_plain_subscriber(self):
+        self.bus = AsyncMessageBus()
+        self.batches = []
+        self.handled = []
+
+        async def batch_handler(msgs):
+            self.batches.append(msgs)
+
+        self.bus.register_batch(Ping, batch_handler)
+        self.bus.register(Pong, lambda msg: self.handled.append(msg))
+
+    def because_we_handle_a_mixed_batch(self):
+        asyncio.run(
+            self.bus.handle_many([Ping(1), Ping(2), Pong(3), Pong(4)]))
+
+    def it_should_await_the_batch_handler(self):
+        expect(self.batches).to(equal([[Ping(1), Ping(2)]]))
+
+    def it_should_handle_the_others_one_at_a_time(self):
+        expect(self.handled).to(equal([Pong(3), Pong(4)]))
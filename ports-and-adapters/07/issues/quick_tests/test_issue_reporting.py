@@ -3,7 +3,7 @@ import uuid
 from .adapters import FakeUnitOfWork
 from issues.domain.messages import ReportIssue, IssueState, IssuePriority
 from issues.domain.model import Issue
-from issues.services import report_issue
+from issues.services import report_issue, report_issues
 
 from expects import expect, have_len, equal, be_true
 
@@ -41,3 +41,28 @@ class When_reporting_an_issue:
 
     def it_should_have_committed_the_unit_of_work(self):
         expect(self.uow.was_committed).to(be_true)
+
+
+class When_reporting_a_batch_of_issues:
+
+    def given_an_empty_unit_of_work(self):
+        self.uow = FakeUnitOfWork()
+        self.starts = 0
+
+    def because_we_report_three_issues(self):
+        cmds = [ReportIssue(uuid.uuid4(), name, email, desc) for _ in range(3)]
+
+        report_issues(self.start_uow, cmds)
+
+    def start_uow(self):
+        self.starts += 1
+        return self.uow
+
+    def it_should_have_created_all_the_issues(self):
+        expect(self.uow.issues).to(have_len(3))
+
+    def it_should_have_used_a_single_unit_of_work(self):
+        expect(self.starts).to(equal(1))
+
+    def it_should_have_committed_the_unit_of_work(self):
+        expect(self.uow.was_committed).to(be_true)
@@ -0,0 +1,84 @@
+import logging
+import uuid
+
+from .adapters import RecordingHandler
+from issues.domain.messages import PickIssue
+from issues.services import logging_handler, log
+
+from expects import expect, equal, be_a, be_false, be_true
+
+
+class When_info_logging_is_disabled:
+
+    def given_a_logger_at_warning(self):
+        self.level = log.level
+        log.setLevel(logging.WARNING)
+
+    def because_we_ask_whether_to_include_the_middleware(self):
+        self.enabled = logging_handler.enabled_for(PickIssue)
+
+    def it_should_leave_the_middleware_out(self):
+        expect(self.enabled).to(be_false)
+
+    def cleanup_the_logger(self):
+        log.setLevel(self.level)
+
+
+class When_logging_a_handled_message:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_logger_at_info(self):
+        self.level = log.level
+        log.setLevel(logging.INFO)
+        self.recorder = RecordingHandler()
+        log.addHandler(self.recorder)
+
+    def because_we_handle_a_message(self):
+        self.enabled = logging_handler.enabled_for(PickIssue)
+        logging_handler(lambda msg: None,
+                        PickIssue(self.issue_id, 'fred@example.org'))
+
+    def it_should_include_the_middleware(self):
+        expect(self.enabled).to(be_true)
+
+    def it_should_record_the_message_type(self):
+        expect(self.recorder.records[0].message_type).to(equal('PickIssue'))
+
+    def it_should_record_the_issue_id(self):
+        expect(self.recorder.records[0].issue_id).to(equal(self.issue_id))
+
+    def cleanup_the_logger(self):
+        log.removeHandler(self.recorder)
+        log.setLevel(self.level)
+
+
+class When_logging_a_message_whose_handler_fails:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_logger_at_info(self):
+        self.level = log.level
+        log.setLevel(logging.INFO)
+        self.recorder = RecordingHandler()
+        log.addHandler(self.recorder)
+
+    def because_the_handler_raises(self):
+        def fail(msg):
+            raise KeyError()
+
+        try:
+            logging_handler(fail, PickIssue(self.issue_id, 'fred@example.org'))
+        except KeyError as e:
+            self.error = e
+
+    def it_should_let_the_error_through(self):
+        expect(self.error).to(be_a(KeyError))
+
+    def it_should_record_the_failure(self):
+        expect(self.recorder.records[0].failed).to(be_true)
+        expect(self.recorder.records[0].levelno).to(equal(logging.ERROR))
+
+    def cleanup_the_logger(self):
+        log.removeHandler(self.recorder)
+        log.setLevel(self.level)
@@ -0,0 +1,84 @@
+from collections import namedtuple
+
+from issues.domain.ports import MessageBus
+
+from expects import expect, equal, have_len
+
+Thing = namedtuple('Thing', ['name'])
+
+
+class SpecialThing(Thing):
+    pass
+
+
+class When_two_message_types_share_a_name:
+
+    def given_a_bus_with_a_handler_for_one_of_them(self):
+        self.other_thing = namedtuple('Thing', ['name'])
+        self.handled = []
+        self.bus = MessageBus()
+        self.bus.register(Thing, self.handled.append)
+
+    def because_we_handle_the_other_one(self):
+        self.bus.handle(self.other_thing('kettle'))
+
+    def it_should_not_call_the_handler(self):
+        expect(self.handled).to(have_len(0))
+
+
+class When_a_handler_is_registered_for_a_base_class:
+
+    def given_a_bus_with_handlers_for_both_classes(self):
+        self.handled = []
+        self.bus = MessageBus()
+        self.bus.register(SpecialThing,
+                          lambda m: self.handled.append(('special', m)))
+        self.bus.register(Thing, lambda m: self.handled.append(('base', m)))
+
+    def because_we_handle_the_subclass(self):
+        self.msg = SpecialThing('teapot')
+        self.bus.handle(self.msg)
+
+    def it_should_call_the_most_specific_handler_first(self):
+        expect(self.handled).to(
+            equal([('special', self.msg), ('base', self.msg)]))
+
+
+class When_a_handler_is_registered_after_dispatch:
+
+    def given_a_bus_that_has_already_dispatched_a_message(self):
+        self.handled = []
+        self.bus = MessageBus()
+        self.bus.handle(Thing('spoon'))
+
+    def because_we_register_a_handler_and_dispatch_again(self):
+        self.bus.register(Thing, self.handled.append)
+        self.bus.handle(Thing('fork'))
+
+    def it_should_call_the_new_handler(self):
+        expect(self.handled).to(equal([Thing('fork')]))
+
+
+class When_handling_a_batch_of_messages:
+
+    def given_a_batch_handler_for_things(self):
+        self.batches = []
+        self.handled = []
+        self.bus = MessageBus()
+        self.bus.register_batch(Thing, self.batches.append)
+        self.bus.register(SpecialThing, self.handled.append)
+
+    def because_we_handle_a_mixed_batch(self):
+        self.bus.handle_many([
+            Thing('cup'),
+            Thing('saucer'),
+            SpecialThing('teapot'),
+            Thing('spoon'),
+        ])
+
+    def it_should_pass_consecutive_things_to_the_batch_handler(self):
+        expect(self.batches).to(
+            equal([[Thing('cup'), Thing('saucer')], [Thing('spoon')]]))
+
+    def it_should_fall_back_to_the_plain_handler(self):
+        expect(self.handled).to(equal([SpecialThing('teapot')]))
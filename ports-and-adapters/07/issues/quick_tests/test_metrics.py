@@ -0,0 +1,84 @@
+from collections import namedtuple
+import threading
+
+from issues.services.metrics import MetricRecorder
+
+from expects import expect, equal, have_len
+
+Job = namedtuple('Job', ['name'])
+JOB = __name__ + ':Job'
+
+
+def ok(msg):
+    pass
+
+
+def broken(msg):
+    raise ValueError(msg)
+
+
+class When_recording_metrics_for_messages:
+
+    def given_a_recorder(self):
+        self.recorder = MetricRecorder()
+
+    def because_we_handle_some_messages_and_one_fails(self):
+        for _ in range(3):
+            self.recorder(ok, Job('tidy'))
+        try:
+            self.recorder(broken, Job('tidy'))
+        except ValueError:
+            pass
+        self.recorder(ok, [Job('a'), Job('b')])
+        self.snapshot = self.recorder.flush()
+
+    def it_should_count_the_messages(self):
+        expect(self.snapshot[JOB]['count']).to(equal(4))
+
+    def it_should_count_the_errors(self):
+        expect(self.snapshot[JOB]['errors']).to(equal(1))
+
+    def it_should_record_batches_separately(self):
+        expect(self.snapshot[JOB + '[]']['count']).to(equal(1))
+
+
+class When_messages_are_recorded_on_many_short_lived_threads:
+
+    def given_a_recorder(self):
+        self.recorder = MetricRecorder()
+
+    def because_a_hundred_threads_each_handle_a_message(self):
+        for _ in range(100):
+            worker = threading.Thread(target=self.recorder,
+                                      args=(ok, Job('tidy')))
+            worker.start()
+            worker.join()
+        self.snapshot = self.recorder.flush()
+
+    def it_should_keep_every_count(self):
+        expect(self.snapshot[JOB]['count']).to(equal(100))
+
+    def it_should_drop_the_accumulators_of_finished_threads(self):
+        expect(self.recorder._accumulators).to(have_len(0))
+
+    def it_should_keep_the_counts_on_the_next_flush(self):
+        expect(self.recorder.flush()[JOB]['count']).to(equal(100))
+
+
+class When_two_messages_share_a_name:
+
+    def given_a_recorder_and_a_job_from_elsewhere(self):
+        self.recorder = MetricRecorder()
+        self.other_job = namedtuple('Job', ['name'], module='elsewhere')
+
+    def because_we_handle_one_of_each(self):
+        self.result = self.recorder(lambda msg: 'done', Job('tidy'))
+        self.recorder(ok, self.other_job('tidy'))
+        self.snapshot = self.recorder.flush()
+
+    def it_should_return_what_the_handler_returned(self):
+        expect(self.result).to(equal('done'))
+
+    def it_should_count_them_separately(self):
+        expect(self.snapshot[JOB]['count']).to(equal(1))
+        expect(self.snapshot['elsewhere:Job']['count']).to(equal(1))
@@ -0,0 +1,48 @@
+from issues.services import compile_pipeline
+
+from expects import expect, equal, be
+
+
+def handler(msg):
+    pass
+
+
+class When_a_middleware_is_disabled_for_a_message_type:
+
+    def given_an_enabled_and_a_disabled_middleware(self):
+        self.calls = []
+
+        def enabled(successor, msg):
+            self.calls.append('enabled')
+            successor(msg)
+
+        def disabled(successor, msg):
+            self.calls.append('disabled')
+            successor(msg)
+
+        disabled.enabled_for = lambda msg_type: msg_type is not str
+        self.pipeline = compile_pipeline(str, disabled, enabled,
+                                         self.calls.append)
+
+    def because_we_run_the_pipeline(self):
+        self.pipeline('msg')
+
+    def it_should_only_run_the_enabled_middleware(self):
+        expect(self.calls).to(equal(['enabled', 'msg']))
+
+
+class When_no_middleware_is_enabled:
+
+    def given_a_disabled_middleware(self):
+
+        def disabled(successor, msg):
+            successor(msg)
+
+        disabled.enabled_for = lambda msg_type: False
+        self.middleware = disabled
+
+    def because_we_compile_the_pipeline(self):
+        self.pipeline = compile_pipeline(str, self.middleware, handler)
+
+    def it_should_return_the_handler_itself(self):
+        expect(self.pipeline).to(be(handler))
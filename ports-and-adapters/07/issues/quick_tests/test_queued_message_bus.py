@@ -0,0 +1,104 @@
+from collections import namedtuple
+import threading
+
+from issues.domain.ports import QueuedMessageBus, MessageBusOverloaded
+
+from expects import expect, equal, be_a, have_len
+
+Job = namedtuple('Job', ['name'])
+
+
+class When_the_bus_queue_is_full:
+
+    def given_a_bus_whose_only_worker_is_busy(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.handled = []
+        self.bus = QueuedMessageBus(workers=1, maxsize=1, timeout=0)
+        self.bus.register(Job, self.slow_handler)
+
+        self.first = self.bus.handle(Job('first'))
+        self.started.wait(1)
+        self.second = self.bus.handle(Job('second'))
+
+    def slow_handler(self, job):
+        self.started.set()
+        self.release.wait(1)
+        self.handled.append(job.name)
+
+    def because_we_send_another_message(self):
+        try:
+            self.bus.handle(Job('third'))
+        except Exception as e:
+            self.error = e
+        self.release.set()
+        self.second.result(1)
+        self.metrics = self.bus.metrics()
+        self.bus.stop()
+
+    def it_should_reject_the_message(self):
+        expect(self.error).to(be_a(MessageBusOverloaded))
+
+    def it_should_handle_the_queued_messages(self):
+        expect(self.handled).to(equal(['first', 'second']))
+
+    def it_should_count_the_rejection(self):
+        expect(self.metrics['rejected']).to(equal(1))
+
+    def it_should_count_the_handled_messages(self):
+        expect(self.metrics['handled']).to(equal(2))
+
+
+class When_the_queued_bus_handles_a_batch:
+
+    def given_a_batch_handler(self):
+        self.batches = []
+        self.bus = QueuedMessageBus(workers=1)
+        self.bus.register_batch(Job, self.handle_batch)
+
+    def handle_batch(self, jobs):
+        self.batches.append((threading.current_thread().name, jobs))
+
+    def because_we_handle_a_batch(self):
+        self.futures = self.bus.handle_many([Job('a'), Job('b')])
+        for future in self.futures:
+            future.result(1)
+        self.metrics = self.bus.metrics()
+        self.bus.stop()
+
+    def it_should_return_a_future_for_the_group(self):
+        expect(self.futures).to(have_len(1))
+
+    def it_should_handle_the_batch_on_a_worker(self):
+        expect(self.batches).to(
+            equal([('bus-worker-0', [Job('a'), Job('b')])]))
+
+    def it_should_count_the_batch(self):
+        expect(self.metrics['handled']).to(equal(1))
+
+
+class When_a_batch_arrives_at_a_full_queue:
+
+    def given_a_bus_whose_only_worker_is_busy(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.bus = QueuedMessageBus(workers=1, maxsize=1, timeout=0)
+        self.bus.register(Job, self.slow_handler)
+        self.bus.handle(Job('first'))
+        self.started.wait(1)
+        self.bus.handle(Job('second'))
+
+    def slow_handler(self, job):
+        self.started.set()
+        self.release.wait(1)
+
+    def because_we_send_a_batch(self):
+        try:
+            self.bus.handle_many([Job('third')])
+        except Exception as e:
+            self.error = e
+        self.release.set()
+        self.bus.stop()
+
+    def it_should_reject_the_batch(self):
+        expect(self.error).to(be_a(MessageBusOverloaded))
@@ -0,0 +1,47 @@
+from issues.domain.ports import ConcurrencyConflict
+from issues.services import retry_on_conflict
+
+from expects import expect, equal, be_a
+
+
+class When_a_handler_hits_a_concurrency_conflict:
+
+    def given_a_handler_that_conflicts_once(self):
+        self.calls = []
+
+        def handler(msg):
+            self.calls.append(msg)
+            if len(self.calls) == 1:
+                raise ConcurrencyConflict()
+
+        self.handler = handler
+
+    def because_we_handle_a_message(self):
+        retry_on_conflict(self.handler, 'assign')
+
+    def it_should_run_the_handler_again(self):
+        expect(self.calls).to(equal(['assign', 'assign']))
+
+
+class When_a_handler_keeps_conflicting:
+
+    def given_a_handler_that_always_conflicts(self):
+        self.calls = []
+
+        def handler(msg):
+            self.calls.append(msg)
+            raise ConcurrencyConflict()
+
+        self.handler = handler
+
+    def because_we_handle_a_message(self):
+        try:
+            retry_on_conflict(self.handler, 'assign')
+        except Exception as e:
+            self.error = e
+
+    def it_should_make_three_attempts(self):
+        expect(self.calls).to(equal(['assign'] * 3))
+
+    def it_should_raise_the_conflict(self):
+        expect(self.error).to(be_a(ConcurrencyConflict))
@@ -2,7 +2,7 @@ import uuid
 
 from .shared_contexts import With_a_new_issue
 
-from issues.services import triage_issue
+from issues.services import triage_issue, triage_issues
 from issues.domain.messages import TriageIssue, IssuePriority, IssueState
 from issues.domain.model import Issue
 
@@ -31,3 +31,23 @@ class When_triaging_an_issue(With_a_new_issue):
 
     def it_should_have_committed_the_unit_of_work(self):
         expect(self.uow.was_committed).to(be_true)
+
+
+class When_triaging_a_batch_of_issues(With_a_new_issue):
+
+    category = 'training'
+    priority = IssuePriority.High
+
+    def because_we_triage_the_issue_in_a_batch(self):
+        cmds = [TriageIssue(self.issue_id, self.category, self.priority)]
+
+        triage_issues(lambda: self.uow, cmds)
+
+    def the_issue_should_have_a_priority_set(self):
+        expect(self.issue.priority).to(equal(IssuePriority.High))
+
+    def the_issue_should_be_awaiting_assignment(self):
+        expect(self.issue.state).to(equal(IssueState.AwaitingAssignment))
+
+    def it_should_have_committed_the_unit_of_work(self):
+        expect(self.uow.was_committed).to(be_true)
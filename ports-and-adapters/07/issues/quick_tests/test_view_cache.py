@@ -0,0 +1,89 @@
+import uuid
+
+from issues.adapters.cache import ViewCache
+
+from expects import expect, equal
+
+
+class With_a_view_cache:
+
+    issue_id = uuid.uuid4()
+    other_id = uuid.uuid4()
+
+    def given_a_view_cache(self):
+        self.cache = ViewCache()
+        self.loads = []
+
+    def view(self, issue_id):
+        return self.cache.issue(issue_id,
+                                lambda: self.loads.append(issue_id) or 'view')
+
+    def page(self, key):
+        return self.cache.page(key, lambda: self.loads.append(key) or 'page')
+
+
+class When_an_issue_view_is_read_twice(With_a_view_cache):
+
+    def because_we_read_the_view_twice(self):
+        self.views = [self.view(self.issue_id), self.view(str(self.issue_id))]
+
+    def it_should_load_the_view_once(self):
+        expect(self.loads).to(equal([self.issue_id]))
+
+    def it_should_return_the_loaded_view(self):
+        expect(self.views).to(equal(['view', 'view']))
+
+
+class When_an_issue_changes_after_being_viewed(With_a_view_cache):
+
+    def given_two_cached_views(self):
+        self.view(self.issue_id)
+        self.view(self.other_id)
+
+    def because_the_issue_changes(self):
+        self.cache.bump([self.issue_id])
+        self.view(self.issue_id)
+        self.view(self.other_id)
+
+    def it_should_reload_only_the_changed_issue(self):
+        expect(self.loads).to(
+            equal([self.issue_id, self.other_id, self.issue_id]))
+
+
+class When_any_issue_changes_after_a_page_is_listed(
+        With_a_view_cache):
+
+    def given_a_cached_page(self):
+        self.page(('after', 0))
+        self.page(('after', 0))
+
+    def because_one_issue_changes_and_another_changes(self):
+        self.cache.bump([self.issue_id])
+        self.page(('after', 0))
+        self.cache.bump([str(self.other_id)])
+        self.page(('after', 0))
+
+    def it_should_reload_the_page_on_each_change(self):
+        expect(self.loads).to(equal([('after', 0)] * 3))
+
+
+class When_more_issues_change_than_the_cache_remembers:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_small_cache_with_a_cached_view(self):
+        self.cache = ViewCache(maxsize=2)
+        self.loads = 0
+        self.view()
+
+    def view(self):
+        def load():
+            self.loads += 1
+        return self.cache.issue(self.issue_id, load)
+
+    def because_the_issue_changes_and_is_forgotten(self):
+        self.cache.bump([self.issue_id, uuid.uuid4(), uuid.uuid4()])
+        self.view()
+
+    def it_should_not_serve_the_old_view(self):
+        expect(self.loads).to(equal(2))
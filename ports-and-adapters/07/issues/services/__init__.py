@@ -1,20 +1,35 @@
 from collections import deque
 from functools import partial
+import inspect
 import logging
+import time
 
 import issues.domain.emails
 from issues.domain.model import Issue, IssueReporter
 from issues.domain import emails, messages
+from issues.domain.ports import (ConcurrencyConflict, IssueNotFoundException,
+                                 run_in_executor)
+from .metrics import MetricRecorder
 
 
-def report_issue(start_uow, cmd):
+def new_issue(cmd):
     reporter = IssueReporter(cmd.reporter_name, cmd.reporter_email)
-    issue = Issue(cmd.issue_id, reporter, cmd.problem_description)
+    return Issue(cmd.issue_id, reporter, cmd.problem_description)
+
+
+def report_issue(start_uow, cmd):
+    issue = new_issue(cmd)
     with start_uow() as tx:
         tx.issues.add(issue)
         tx.commit()
 
 
+def report_issues(start_uow, cmds):
+    with start_uow() as tx:
+        tx.issues.add_reported(cmds)
+        tx.commit()
+
+
 def triage_issue(start_uow, cmd):
     with start_uow() as tx:
         issue = tx.issues.get(cmd.issue_id)
@@ -22,6 +37,16 @@ def triage_issue(start_uow, cmd):
         tx.commit()
 
 
+def triage_issues(start_uow, cmds):
+    with start_uow() as tx:
+        found = tx.issues.get_many(cmd.issue_id for cmd in cmds)
+        if any(cmd.issue_id not in found for cmd in cmds):
+            raise IssueNotFoundException()
+        for cmd in cmds:
+            found[cmd.issue_id].triage(cmd.priority, cmd.category)
+        tx.commit()
+
+
 def pick_issue(start_uow, cmd):
     with start_uow() as tx:
         issue = tx.issues.get(cmd.issue_id)
@@ -49,23 +74,107 @@ def on_issue_assigned_to_engineer(view_issue, sender, evt):
     sender.send(request, data)
 
 
-def logging_handler(successor, msg):
-    logging.info("Handling %s", msg)
-    successor(msg)
+log = logging.getLogger(__name__)
 
 
-def metric_recorder(successor, msg):
-    logging.info("Recording metrics for %s", msg)
-    successor(msg)
+def logging_handler(successor, msg):
+    """
+    Logs a structured record for each message handled: its type, its
+    issue_id, how long it took and whether it failed. The message itself is
+    never rendered. A message whose handler raises is logged at ERROR, and
+    the exception is left to propagate.
+    """
+    started = time.perf_counter()
+    failed = True
+    try:
+        result = successor(msg)
+        failed = False
+        return result
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if type(msg) is list:
+            message_type = type(msg[0]).__name__ + '[]' if msg else 'list'
+            issue_id = None
+        else:
+            message_type = type(msg).__name__
+            issue_id = getattr(msg, 'issue_id', None)
+
+        log.log(logging.ERROR if failed else logging.INFO,
+                "%s message_type=%s issue_id=%s duration_ms=%.3f",
+                'failed' if failed else 'handled',
+                message_type, issue_id, duration_ms, extra={
+                    'message_type': message_type,
+                    'issue_id': issue_id,
+                    'duration_ms': duration_ms,
+                    'failed': failed
+                })
+
+
+# Checked once, when the pipeline is compiled; if INFO is off, the
+# middleware isn't in the pipeline at all. Pipelines built by
+# adapters.config pick up a new log level on config.rebuild_pipelines().
+logging_handler.enabled_for = lambda msg_type: log.isEnabledFor(logging.INFO)
+
+
+metric_recorder = MetricRecorder()
+
+
+def retry(*exceptions, attempts=3):
+    """
+    Builds a middleware that re-runs its successor when it raises one of
+    `exceptions`, up to `attempts` times in all.
+    """
+
+    def retry_middleware(successor, msg):
+        for attempt in range(1, attempts + 1):
+            try:
+                return successor(msg)
+            except exceptions:
+                if attempt == attempts:
+                    raise
+                log.info("retrying message_type=%s attempt=%d",
+                         type(msg).__name__, attempt + 1)
+
+    return retry_middleware
+
+
+retry_on_conflict = retry(ConcurrencyConflict)
 
 
 def pipeline(*args):
-
-    def construct(head, tail):
-        if not tail:
-            return head
-        nexthead, *nexttail = tail
-        return partial(head, construct(nexthead, nexttail))
-
-    head, *tail = args
-    return construct(head, tail)
+    *middleware, handler = args
+    for head in reversed(middleware):
+        handler = partial(head, handler)
+    return handler
+
+
+def compile_pipeline(msg_type, *args):
+    """
+    Builds the pipeline for one type of message. Middleware can have an
+    `enabled_for(msg_type)` function; if it returns False, the middleware
+    is left out of the pipeline entirely. With no middleware left, the
+    handler itself is returned, so the bus calls it directly.
+
+    The decision is made once, when the pipeline is built, so changes to
+    the things it depends on (like log levels) need a new pipeline.
+    """
+    *middleware, handler = args
+    active = [
+        m for m in middleware
+        if getattr(m, 'enabled_for', None) is None or m.enabled_for(msg_type)
+    ]
+    return pipeline(*active, handler)
+
+
+def async_pipeline(*args, executor=None):
+    """
+    Builds a pipeline for the AsyncMessageBus. Middleware are coroutines
+    that take (successor, msg) and await their successor. The final handler
+    can be a coroutine or a plain function; plain functions are run in an
+    executor so that they don't block the event loop.
+    """
+    *middleware, handler = args
+    if not inspect.iscoroutinefunction(handler):
+        handler = partial(run_in_executor, executor, handler)
+    return pipeline(*middleware, handler)
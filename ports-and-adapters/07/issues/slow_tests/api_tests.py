@@ -48,3 +48,34 @@ class When_assigning_an_issue_to_another_engineer:
 
     def it_should_be_fine(self):
         expect(self.response.status_code).to(equal(200))
+
+
+class When_polling_an_issue_that_has_not_changed:
+
+    def given_an_issue_we_have_already_fetched(self):
+        self.location = report_issue()
+        self.etag = requests.get(self.location).headers['ETag']
+
+    def because_we_fetch_the_issue_again_with_its_etag(self):
+        self.response = requests.get(
+            self.location, headers={'If-None-Match': self.etag})
+
+    def it_should_say_the_issue_is_not_modified(self):
+        expect(self.response.status_code).to(equal(304))
+
+
+class When_polling_an_issue_that_has_been_assigned:
+
+    def given_an_issue_we_have_already_fetched(self):
+        self.location = report_issue()
+        self.etag = requests.get(self.location).headers['ETag']
+
+    def because_the_issue_is_assigned_and_fetched_again(self):
+        requests.post(self.location + '/assign?engineer=constance',
+                      headers={'X-Email': 'barbara@example.org'})
+        self.response = requests.get(
+            self.location, headers={'If-None-Match': self.etag})
+
+    def it_should_return_the_new_version(self):
+        expect(self.response.status_code).to(equal(200))
+        expect(self.response.headers['ETag']).not_to(equal(self.etag))
@@ -0,0 +1,107 @@
+import asyncio
+from functools import partial
+import os
+import tempfile
+import uuid
+
+from issues.adapters import views
+from issues.adapters.async_orm import AsyncSqlAlchemy
+from issues.adapters.orm import SqlAlchemy
+from issues.adapters.projections import IssueViewProjection
+from issues.domain.messages import (ReportIssue, AssignIssue,
+                                    IssueAssignedToEngineer)
+from issues.domain.model import Issue, IssueReporter
+from issues.domain.ports import AsyncMessageBus
+from issues import services
+
+from expects import expect, equal, have_len
+
+
+class When_we_assign_an_issue_in_an_async_unit_of_work:
+
+    issue_id = uuid.uuid4()
+
+    def given_an_async_database(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        self.published = []
+
+        async def subscriber(event):
+            self.published.append(event)
+
+        bus = AsyncMessageBus()
+        bus.register(IssueAssignedToEngineer, subscriber)
+        sync = SqlAlchemy(uri, bus)
+        sync.configure_mappings()
+        sync.create_schema()
+        self.db = AsyncSqlAlchemy(sync, bus)
+
+    async def assign(self):
+        async with self.db.start_unit_of_work() as uow:
+            await uow.issues.add(
+                Issue(self.issue_id,
+                      IssueReporter('fred', 'fred@example.org'), 'help'))
+            await uow.commit()
+
+        async with self.db.start_unit_of_work() as uow:
+            issue = await uow.issues.get(self.issue_id)
+            issue.assign('mary', 'bob')
+            await uow.commit()
+
+        IssueViewProjection(self.db.db.get_session).rebuild()
+
+        self.view = await views.view_issue_async(self.db, self.issue_id)
+        self.listed = await views.list_issues_async(self.db)
+
+    def because_we_report_and_assign_the_issue(self):
+        asyncio.run(self.assign())
+
+    def it_should_publish_the_event_on_the_loop(self):
+        expect(self.published).to(have_len(1))
+        expect(self.published[0].assigned_to).to(equal('mary'))
+
+    def it_should_return_the_same_view_as_the_sync_view(self):
+        expect(self.view).to(
+            equal(views.view_issue(self.db.db.get_session, self.issue_id)))
+
+    def it_should_list_the_issue(self):
+        expect(self.listed['issues']).to(have_len(1))
+        expect(self.listed['issues'][0]['issue_id']).to(equal(self.issue_id))
+
+    def cleanup_the_database_threads(self):
+        self.db.shutdown()
+
+
+class When_a_plain_handler_on_the_async_bus_raises_events:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_sync_database_behind_an_async_bus(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        self.published = []
+
+        async def subscriber(event):
+            self.published.append(event)
+
+        self.bus = AsyncMessageBus()
+        self.db = SqlAlchemy(uri, self.bus)
+        self.db.configure_mappings()
+        self.db.create_schema()
+        self.bus.register(
+            ReportIssue, partial(services.report_issue,
+                                 self.db.start_unit_of_work))
+        self.bus.register(
+            AssignIssue, partial(services.assign_issue,
+                                 self.db.start_unit_of_work))
+        self.bus.register(IssueAssignedToEngineer, subscriber)
+
+    async def assign(self):
+        await self.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+        await self.bus.handle(AssignIssue(self.issue_id, 'mary', 'bob'))
+
+    def because_we_assign_an_issue_to_someone_else(self):
+        asyncio.run(self.assign())
+
+    def it_should_publish_the_event(self):
+        expect(self.published).to(
+            equal([IssueAssignedToEngineer(self.issue_id, 'mary', 'bob')]))
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import uuid
+
+from issues.adapters.orm import SqlAlchemy, SqlAlchemyUnitOfWork
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus, ConcurrencyConflict
+from issues import services
+
+from expects import expect, equal, be_a
+
+
+class When_two_units_of_work_assign_the_same_issue:
+
+    issue_id = uuid.uuid4()
+
+    def given_an_issue_loaded_by_two_units_of_work(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        self.db = SqlAlchemy(uri, MessageBus())
+        self.db.configure_mappings()
+        self.db.create_schema()
+        services.report_issue(
+            self.db.start_unit_of_work,
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+        # Each unit of work gets its own session, like two workers would.
+        sessions = self.db._session_maker.session_factory
+        self.first = SqlAlchemyUnitOfWork(sessions, self.db.bus).__enter__()
+        self.second = SqlAlchemyUnitOfWork(sessions, self.db.bus).__enter__()
+        self.first.issues.get(self.issue_id).assign('mary@example.org')
+        self.second.issues.get(self.issue_id).assign('lucy@example.org')
+
+    def because_both_commit(self):
+        self.first.commit()
+        try:
+            self.second.commit()
+        except Exception as e:
+            self.error = e
+
+    def it_should_reject_the_second_commit(self):
+        expect(self.error).to(be_a(ConcurrencyConflict))
+
+    def it_should_keep_the_first_assignment(self):
+        with self.db.start_unit_of_work() as tx:
+            expect(tx.issues.get(self.issue_id).assigned_to).to(
+                equal('mary@example.org'))
@@ -0,0 +1,87 @@
+from contextlib import redirect_stdout
+import io
+import logging
+import uuid
+
+from issues.adapters import config, views
+from issues.domain.messages import (ReportIssue, TriageIssue, AssignIssue,
+                                    IssuePriority)
+from issues.quick_tests.adapters import RecordingHandler
+from issues.services import log
+
+from expects import expect, equal, have_keys
+
+
+class When_info_logging_is_enabled_once_config_is_imported:
+
+    issue_id = uuid.uuid4()
+
+    def given_pipelines_built_with_logging_off(self):
+        self.level = log.level
+        log.setLevel(logging.WARNING)
+        config.rebuild_pipelines()
+        self.recorder = RecordingHandler()
+        log.addHandler(self.recorder)
+
+    def because_we_turn_on_info_and_rebuild_the_pipelines(self):
+        log.setLevel(logging.INFO)
+        config.rebuild_pipelines()
+        config.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+    def it_should_log_the_message(self):
+        expect([r.issue_id for r in self.recorder.records]).to(
+            equal([self.issue_id]))
+
+    def cleanup_the_logger(self):
+        log.removeHandler(self.recorder)
+        log.setLevel(self.level)
+        config.rebuild_pipelines()
+
+
+class When_an_issue_changes_after_its_view_is_cached:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_cached_view(self):
+        config.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+        self.view()
+
+    def view(self):
+        return config.view_cache.issue(
+            self.issue_id,
+            lambda: views.view_issue(config.db.get_session, self.issue_id))
+
+    def because_the_issue_is_triaged(self):
+        config.bus.handle(
+            TriageIssue(self.issue_id, 'printers', IssuePriority.High))
+        self.triaged = self.view()
+
+    def it_should_serve_the_new_view(self):
+        expect(self.triaged).to(have_keys(state='AwaitingAssignment',
+                                          category='printers'))
+
+
+class When_an_issue_is_assigned_to_an_engineer_through_config:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_reported_issue(self):
+        config.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org',
+                        'the printer is sad'))
+
+    def because_bob_assigns_the_issue_to_mary(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            config.bus.handle(
+                AssignIssue(self.issue_id, 'mary@example.org',
+                            'bob@example.org'))
+        self.output = stdout.getvalue()
+
+    def it_should_email_mary(self):
+        expect(self.output).to(equal(
+            "Sending email to mary@example.org from issues@example.org\n"
+            "subject:Hi mary@example.org - you've been assigned an issue\n"
+            "the printer is sad\n"))
@@ -0,0 +1,59 @@
+import threading
+import uuid
+
+from issues.adapters import flask
+from issues.domain.messages import PickIssue
+from issues.domain.ports import QueuedMessageBus, IssueNotFoundException
+
+from expects import expect, equal
+
+
+class With_a_queued_bus_behind_the_api:
+
+    issue_id = uuid.uuid4()
+
+    def given_the_api_on_a_queued_bus(self):
+        self.bus = QueuedMessageBus(workers=1)
+        self.bus_before, flask.bus = flask.bus, self.bus
+        self.client = flask.app.test_client()
+
+    def pick(self):
+        return self.client.post('/issues/{}/pick'.format(self.issue_id),
+                                headers={'X-email': 'fred@example.org'})
+
+    def cleanup_the_bus(self):
+        flask.bus = self.bus_before
+        self.bus.stop()
+
+
+class When_a_queued_command_fails(With_a_queued_bus_behind_the_api):
+
+    def given_a_handler_for_a_missing_issue(self):
+        def missing(cmd):
+            raise IssueNotFoundException()
+
+        self.bus.register(PickIssue, missing)
+
+    def because_we_pick_the_issue(self):
+        self.response = self.pick()
+
+    def it_should_answer_not_found(self):
+        expect(self.response.status_code).to(equal(404))
+
+
+class When_a_queued_command_takes_too_long(With_a_queued_bus_behind_the_api):
+
+    def given_a_handler_that_waits(self):
+        self.release = threading.Event()
+        self.bus.register(PickIssue, lambda cmd: self.release.wait())
+        self.timeout, flask.COMMAND_TIMEOUT = flask.COMMAND_TIMEOUT, 0.01
+
+    def because_we_pick_the_issue(self):
+        self.response = self.pick()
+
+    def it_should_answer_accepted(self):
+        expect(self.response.status_code).to(equal(202))
+
+    def cleanup_the_handler(self):
+        flask.COMMAND_TIMEOUT = self.timeout
+        self.release.set()
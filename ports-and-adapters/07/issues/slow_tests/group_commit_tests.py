@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import uuid
+
+from sqlalchemy import event
+
+from issues.adapters.orm import (SqlAlchemy, SqlAlchemyUnitOfWork,
+                                 SqliteProfile, GroupCommit)
+from issues.adapters.projections import IssueViewProjection
+from issues.domain.messages import ReportIssue, IssueAssignedToEngineer
+from issues.domain.ports import MessageBus, ConcurrencyConflict
+from issues import services
+
+from expects import expect, equal, be_a, be_below
+
+
+class With_group_commit:
+
+    def given_a_database_with_group_commit(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        self.bus = MessageBus()
+        self.db = SqlAlchemy(uri,
+                             self.bus,
+                             sqlite_profile=SqliteProfile(),
+                             group_commit=GroupCommit(window=0.05))
+        self.db.configure_mappings()
+        self.db.create_schema()
+
+    def cleanup_the_writer(self):
+        self.db.writer.stop()
+
+
+class When_many_threads_commit_at_once(With_group_commit):
+
+    def given_twenty_threads_that_report_issues(self):
+        self.commits = []
+        self.published = []
+        event.listen(self.db.engine, 'commit',
+                     lambda conn: self.commits.append(1))
+        self.bus.register(ReportIssue, self.report)
+        self.bus.register(IssueAssignedToEngineer, self.published.append)
+        self.db.add_write_hook(
+            IssueViewProjection(self.db.get_session).refresh)
+        self.ids = [uuid.uuid4() for _ in range(20)]
+        self.threads = [
+            threading.Thread(target=self.bus.handle,
+                             args=(ReportIssue(i, 'fred', 'fred@example.org',
+                                               'help'), ))
+            for i in self.ids
+        ]
+
+    def report(self, cmd):
+        services.report_issue(self.db.start_unit_of_work, cmd)
+        with self.db.start_unit_of_work() as tx:
+            tx.issues.get(cmd.issue_id).assign('mary', 'bob')
+            tx.commit()
+
+    def because_they_all_report_and_assign_an_issue(self):
+        for t in self.threads:
+            t.start()
+        for t in self.threads:
+            t.join()
+
+    def it_should_save_every_issue(self):
+        found = self.db.get_session().execute(
+            'SELECT COUNT(*) FROM issues WHERE assigned_to = :name',
+            {'name': 'mary'}).scalar()
+        expect(found).to(equal(20))
+
+    def it_should_write_the_views_in_the_same_commits(self):
+        found = self.db.get_session().execute(
+            'SELECT COUNT(*) FROM issue_views WHERE assigned_to = :name',
+            {'name': 'mary'}).scalar()
+        expect(found).to(equal(20))
+
+    def it_should_commit_less_often_than_once_per_unit(self):
+        expect(len(self.commits)).to(be_below(40))
+
+    def it_should_publish_each_units_events(self):
+        expect(sorted(e.issue_id for e in self.published)).to(
+            equal(sorted(self.ids)))
+
+
+class When_a_unit_in_a_group_is_stale(With_group_commit):
+
+    issue_id = uuid.uuid4()
+
+    def given_an_issue_loaded_by_two_units_of_work(self):
+        services.report_issue(
+            self.db.start_unit_of_work,
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+        sessions = self.db._session_maker.session_factory
+        self.first, self.second = [
+            SqlAlchemyUnitOfWork(sessions, self.bus,
+                                 group_commit=self.db.writer).__enter__()
+            for _ in range(2)
+        ]
+        self.first.issues.get(self.issue_id).assign('mary')
+        self.second.issues.get(self.issue_id).assign('lucy')
+
+    def because_both_commit(self):
+        self.first.commit()
+        try:
+            self.second.commit()
+        except Exception as e:
+            self.error = e
+
+    def it_should_reject_the_second_commit(self):
+        expect(self.error).to(be_a(ConcurrencyConflict))
+
+    def it_should_keep_the_first_assignment(self):
+        with self.db.start_unit_of_work() as tx:
+            expect(tx.issues.get(self.issue_id).assigned_to).to(equal('mary'))
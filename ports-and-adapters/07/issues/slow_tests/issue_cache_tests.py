@@ -0,0 +1,69 @@
+import uuid
+
+from sqlalchemy import event
+
+from issues.adapters.cache import LRUCache
+from issues.adapters.orm import SqlAlchemy
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+from expects import expect, equal, have_len
+
+
+class With_a_cached_database:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_database_with_an_issue_cache(self):
+        self.cache = LRUCache(maxsize=10, ttl=60)
+        self.db = SqlAlchemy('sqlite://', MessageBus(), issue_cache=self.cache)
+        self.db.recreate_schema()
+        services.report_issue(
+            self.db.start_unit_of_work,
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+        self.statements = []
+        event.listen(self.db.engine, 'before_cursor_execute', self.count)
+
+    def count(self, conn, cursor, statement, *args):
+        if statement.startswith('SELECT'):
+            self.statements.append(statement)
+
+    def pick(self, engineer):
+        with self.db.start_unit_of_work() as tx:
+            tx.issues.get(self.issue_id).assign(engineer)
+            tx.commit()
+        self.db.remove_session()
+
+    def load(self):
+        with self.db.start_unit_of_work() as tx:
+            issue = tx.issues.get(self.issue_id)
+            assignment = issue.assignment
+            assignee = assignment.assigned_to if assignment else None
+        self.db.remove_session()
+        return assignee
+
+
+class When_an_issue_is_loaded_twice(With_a_cached_database):
+
+    def because_we_load_the_issue_twice(self):
+        self.load()
+        self.load()
+
+    def it_should_only_query_the_database_once(self):
+        expect(self.statements).to(have_len(1))
+
+    def it_should_count_a_hit_and_a_miss(self):
+        expect((self.cache.hits, self.cache.misses)).to(equal((1, 1)))
+
+
+class When_a_cached_issue_is_changed(With_a_cached_database):
+
+    def because_we_reassign_the_cached_issue(self):
+        self.load()
+        self.pick('mary@example.org')
+        self.pick('lucy@example.org')
+        self.assignee = self.load()
+
+    def it_should_see_the_latest_assignment(self):
+        expect(self.assignee).to(equal('lucy@example.org'))
@@ -1,6 +1,6 @@
 from issues.domain.ports import MessageBus
 from issues.domain.model import Issue
-from issues.domain.messages import ReportIssue
+from issues.domain.messages import ReportIssue, PickIssue
 from issues.adapters.orm import SqlAlchemy
 from issues.adapters import views
 
@@ -8,6 +8,7 @@ from issues.adapters import config
 
 import uuid
 
+from sqlalchemy import event
 from expects import expect, equal, have_len
 
 
@@ -36,3 +37,95 @@ class When_we_load_a_persisted_issue:
 
     def it_should_have_the_correct_reporter_details(self):
         expect(self.issue['reporter_email']).to(equal('fred@example.org'))
+
+
+class When_we_load_many_issues_at_once:
+
+    issue_ids = [uuid.uuid4() for _ in range(3)]
+
+    def given_three_issues_that_have_been_picked(self):
+        for issue_id in self.issue_ids:
+            config.bus.handle(
+                ReportIssue(issue_id, 'fred', 'fred@example.org', 'help'))
+            config.bus.handle(PickIssue(issue_id, 'mary@example.org'))
+        config.db.remove_session()
+
+    def because_we_load_them_and_read_their_assignments(self):
+        self.statements = []
+        event.listen(config.db.engine, 'before_cursor_execute', self.count)
+        with config.db.start_unit_of_work() as tx:
+            self.issues = tx.issues.get_many(self.issue_ids + [uuid.uuid4()])
+            self.assignees = [
+                i.assignment.assigned_to for i in self.issues.values()
+            ]
+        event.remove(config.db.engine, 'before_cursor_execute', self.count)
+
+    def count(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def it_should_return_the_issues_that_exist_keyed_by_id(self):
+        expect(sorted(self.issues)).to(equal(sorted(self.issue_ids)))
+
+    def it_should_have_loaded_the_current_assignments(self):
+        expect(self.assignees).to(equal(['mary@example.org'] * 3))
+
+    def it_should_use_a_single_query(self):
+        expect(self.statements).to(have_len(1))
+
+
+class When_we_reassign_an_issue_with_a_long_history:
+
+    issue_id = uuid.uuid4()
+
+    def given_an_issue_that_has_been_picked_many_times(self):
+        config.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+        for i in range(20):
+            config.bus.handle(PickIssue(self.issue_id, 'engineer%d' % i))
+        config.db.remove_session()
+
+    def because_we_pick_the_issue_again(self):
+        self.statements = []
+        event.listen(config.db.engine, 'before_cursor_execute', self.count)
+        config.bus.handle(PickIssue(self.issue_id, 'mary@example.org'))
+        event.remove(config.db.engine, 'before_cursor_execute', self.count)
+
+    def count(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def it_should_not_load_the_assignment_history(self):
+        expect([s for s in self.statements
+                if 'FROM assignments' in s]).to(have_len(0))
+
+
+class When_we_report_a_batch_of_issues_in_bulk:
+
+    issue_ids = [uuid.uuid4() for _ in range(3)]
+
+    def given_a_batch_of_reports(self):
+        self.cmds = [
+            ReportIssue(issue_id, 'fred', 'fred@example.org', 'help')
+            for issue_id in self.issue_ids
+        ]
+
+    def because_we_handle_them_together(self):
+        self.statements = []
+        event.listen(config.db.engine, 'before_cursor_execute', self.count)
+        config.bus.handle_many(self.cmds)
+        event.remove(config.db.engine, 'before_cursor_execute', self.count)
+
+    def count(self, conn, cursor, statement, *args):
+        if statement.startswith('INSERT INTO issues '):
+            self.statements.append(statement)
+
+    def it_should_insert_them_in_a_single_statement(self):
+        expect(self.statements).to(have_len(1))
+
+    def it_should_store_issues_that_the_views_can_read(self):
+        issue = views.view_issue(config.db.get_session, self.issue_ids[2])
+        expect(issue['reporter_email']).to(equal('fred@example.org'))
+
+    def it_should_store_issues_that_can_be_loaded(self):
+        with config.db.start_unit_of_work() as tx:
+            issue = tx.issues.get(self.issue_ids[0])
+            expect(issue.reporter.name).to(equal('fred'))
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import uuid
+
+from issues.adapters import views
+from issues.adapters.orm import SqlAlchemy
+from issues.domain.messages import ReportIssue, TriageIssue, IssuePriority
+from issues.domain.ports import MessageBus
+from issues import services
+
+from expects import expect, equal, contain, be_none, have_keys
+
+
+class With_five_issues:
+
+    def given_five_issues_two_of_them_triaged(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        self.db = SqlAlchemy(uri, MessageBus())
+        self.db.configure_mappings()
+        self.db.create_schema()
+        self.ids = [uuid.uuid4() for _ in range(5)]
+        for issue_id in self.ids:
+            services.report_issue(
+                self.db.start_unit_of_work,
+                ReportIssue(issue_id, 'fred', 'fred@example.org', 'help'))
+        for issue_id in self.ids[1::2]:
+            services.triage_issue(
+                self.db.start_unit_of_work,
+                TriageIssue(issue_id, 'bug', IssuePriority.High))
+
+
+class When_we_page_through_the_issues(With_five_issues):
+
+    def because_we_read_two_pages(self):
+        self.first = views.list_issues(self.db.get_session, limit=3)
+        self.second = views.list_issues(
+            self.db.get_session, after=self.first['next'], limit=3)
+
+    def it_should_return_the_first_page_in_order(self):
+        expect([i['issue_id'] for i in self.first['issues']]).to(
+            equal(self.ids[:3]))
+
+    def it_should_continue_from_the_cursor(self):
+        expect([i['issue_id'] for i in self.second['issues']]).to(
+            equal(self.ids[3:]))
+
+    def it_should_end_on_the_last_page(self):
+        expect(self.second['next']).to(be_none)
+
+
+class When_we_filter_the_issues(With_five_issues):
+
+    def because_we_list_the_high_priority_bugs(self):
+        self.view = views.list_issues(self.db.get_session,
+                                      priority=IssuePriority.High,
+                                      category='bug',
+                                      state='AwaitingAssignment')
+
+    def it_should_return_only_the_triaged_issues(self):
+        expect([i['issue_id'] for i in self.view['issues']]).to(
+            equal(self.ids[1::2]))
+
+    def it_should_use_the_composite_index(self):
+        plan = self.db.get_session().execute(
+            'EXPLAIN QUERY PLAN ' + views.LIST_ISSUES.format(
+                'pk > :after AND state = :state'),
+            {'after': 0, 'state': 'ReadyForWork', 'limit': 10}).fetchall()
+        expect(str(plan)).to(contain('ix_issues_state_pk'))
+
+
+class When_we_export_the_issues(With_five_issues):
+
+    def because_we_export_them_two_rows_at_a_time(self):
+        lines = views.export_issues(self.db.get_session, chunk_size=2)
+        self.exported = [json.loads(line) for line in lines]
+
+    def it_should_write_every_issue_in_order(self):
+        expect([i['issue_id'] for i in self.exported]).to(
+            equal([str(i) for i in self.ids]))
+
+    def it_should_include_the_triage_details(self):
+        expect(self.exported[1]).to(
+            have_keys(priority='High', category='bug',
+                      state='AwaitingAssignment'))
+
+
+class When_an_issue_on_a_page_changes(With_five_issues):
+
+    def given_the_etags_of_both_pages(self):
+        self.etags = self.page_etags()
+
+    def page_etags(self):
+        return [
+            views.page_etag(
+                views.list_issues(self.db.get_session, after=after, limit=3))
+            for after in (0, 3)
+        ]
+
+    def because_the_first_issue_is_triaged(self):
+        services.triage_issue(self.db.start_unit_of_work,
+                              TriageIssue(self.ids[0], 'bug',
+                                          IssuePriority.Low))
+        self.new_etags = self.page_etags()
+
+    def it_should_change_the_etag_of_its_page(self):
+        expect(self.new_etags[0]).not_to(equal(self.etags[0]))
+
+    def it_should_not_change_the_etag_of_the_other_page(self):
+        expect(self.new_etags[1]).to(equal(self.etags[1]))
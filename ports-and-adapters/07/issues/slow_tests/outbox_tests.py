@@ -0,0 +1,69 @@
+import uuid
+
+from issues.adapters.orm import SqlAlchemy
+from issues.adapters.outbox import OutboxRelay
+from issues.domain.messages import IssueAssignedToEngineer
+from issues.domain.model import Issue, IssueReporter
+from issues.domain.ports import MessageBus
+
+from expects import expect, equal, have_len
+
+
+class When_a_unit_of_work_uses_the_outbox:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_database_with_an_outbox(self):
+        self.handled = []
+        bus = MessageBus()
+        bus.register(IssueAssignedToEngineer, self.handled.append)
+        self.db = SqlAlchemy('sqlite://', bus, use_outbox=True)
+        self.db.recreate_schema()
+        self.relay = OutboxRelay(self.db.get_session, bus, batch_size=10)
+
+    def because_we_assign_an_issue_to_another_engineer(self):
+        with self.db.start_unit_of_work() as tx:
+            issue = Issue(self.issue_id,
+                          IssueReporter('fred', 'fred@example.org'),
+                          'my mouse is on fire')
+            tx.issues.add(issue)
+            issue.assign('mary@example.org', 'lucy@example.org')
+            tx.commit()
+        self.handled_before_relay = list(self.handled)
+        self.first_drain = self.relay.drain()
+        self.second_drain = self.relay.drain()
+
+    def it_should_not_publish_the_event_on_commit(self):
+        expect(self.handled_before_relay).to(have_len(0))
+
+    def it_should_deliver_the_event_from_the_outbox(self):
+        expect(self.handled).to(
+            equal([
+                IssueAssignedToEngineer(self.issue_id, 'mary@example.org',
+                                        'lucy@example.org')
+            ]))
+
+    def it_should_mark_the_event_as_delivered(self):
+        expect((self.first_drain, self.second_drain)).to(equal((1, 0)))
+
+
+class When_a_unit_of_work_is_not_committed:
+
+    def given_a_database(self):
+        self.handled = []
+        bus = MessageBus()
+        bus.register(IssueAssignedToEngineer, self.handled.append)
+        self.db = SqlAlchemy('sqlite://', bus)
+        self.db.recreate_schema()
+
+    def because_we_flush_an_event_without_committing(self):
+        with self.db.start_unit_of_work() as tx:
+            issue = Issue(uuid.uuid4(),
+                          IssueReporter('fred', 'fred@example.org'),
+                          'my keyboard is upside down')
+            issue.assign('mary@example.org', 'lucy@example.org')
+            tx.issues.add(issue)
+            tx.session.flush()
+
+    def it_should_not_publish_the_event(self):
+        expect(self.handled).to(have_len(0))
@@ -0,0 +1,188 @@
+from functools import partial
+import os
+import tempfile
+import uuid
+
+from sqlalchemy import select
+
+from issues.adapters import views
+from issues.adapters.orm import SqlAlchemy, issue_views, projection_checkpoints
+from issues.adapters.projections import IssueViewProjection
+from issues.domain.messages import (ReportIssue, TriageIssue, AssignIssue,
+                                    PickIssue, IssuePriority,
+                                    IssueAssignedToEngineer)
+from issues.domain.ports import MessageBus
+from issues import services
+
+from expects import expect, equal, be_a, have_keys
+
+
+class With_a_projected_database:
+
+    def given_a_database_with_the_projection_hooked_up(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        self.bus = MessageBus()
+        self.db = SqlAlchemy(uri, self.bus)
+        self.db.configure_mappings()
+        self.db.create_schema()
+        for msg, handler in [(ReportIssue, services.report_issue),
+                             (TriageIssue, services.triage_issue),
+                             (AssignIssue, services.assign_issue),
+                             (PickIssue, services.pick_issue)]:
+            self.bus.register(msg,
+                              partial(handler, self.db.start_unit_of_work))
+        self.projection = IssueViewProjection(self.db.get_session)
+        self.db.add_write_hook(self.projection.refresh)
+
+    def work_on(self, issue_id):
+        self.bus.handle(
+            ReportIssue(issue_id, 'fred', 'fred@example.org', 'help'))
+        self.bus.handle(TriageIssue(issue_id, 'bug', IssuePriority.High))
+        self.bus.handle(PickIssue(issue_id, 'mary'))
+        self.bus.handle(AssignIssue(issue_id, 'lucy', 'bob'))
+
+    def projected(self):
+        rows = self.db.get_session().execute(
+            select([issue_views]).order_by(issue_views.c.issue_id))
+        return [dict(r, version=None) for r in rows]
+
+
+class When_an_issue_is_worked_on(With_a_projected_database):
+
+    issue_id = uuid.uuid4()
+
+    def because_the_issue_is_triaged_picked_and_reassigned(self):
+        self.work_on(self.issue_id)
+
+    def it_should_show_the_latest_state_in_the_view(self):
+        view = views.view_issue(self.db.get_session, self.issue_id)
+        expect(view).to(
+            have_keys(description='help',
+                      reporter_name='fred',
+                      state='ReadyForWork',
+                      priority='High',
+                      category='bug',
+                      assigned_to='lucy',
+                      assigned_by='bob',
+                      reassignments=1))
+
+
+class When_an_issue_is_assigned_to_an_engineer(With_a_projected_database):
+
+    issue_id = uuid.uuid4()
+
+    def given_a_subscriber_that_views_the_issue(self):
+        self.seen = []
+        self.bus.register(
+            IssueAssignedToEngineer, lambda evt: self.seen.append(
+                views.view_issue(self.db.get_session, evt.issue_id)))
+        self.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+    def because_the_issue_is_assigned(self):
+        self.bus.handle(AssignIssue(self.issue_id, 'lucy', 'bob'))
+
+    def it_should_update_the_view_before_publishing_the_event(self):
+        expect(self.seen[0]).to(
+            have_keys(state='ReadyForWork', assigned_to='lucy'))
+
+
+class When_a_unit_of_work_is_not_committed(With_a_projected_database):
+
+    issue_id = uuid.uuid4()
+
+    def given_a_reported_issue(self):
+        self.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+    def because_we_assign_the_issue_and_roll_back(self):
+        with self.db.start_unit_of_work() as tx:
+            tx.issues.get(self.issue_id).assign('lucy', 'bob')
+            tx.rollback()
+
+    def it_should_leave_the_view_alone(self):
+        view = views.view_issue(self.db.get_session, self.issue_id)
+        expect(view).to(have_keys(state='AwaitingTriage', assigned_to=None))
+
+
+class When_writing_the_view_fails(With_a_projected_database):
+
+    issue_id = uuid.uuid4()
+
+    def given_a_write_hook_that_fails(self):
+        def fail(session, issue_ids):
+            raise KeyError()
+
+        self.db.add_write_hook(fail)
+
+    def because_we_report_an_issue(self):
+        try:
+            self.bus.handle(
+                ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+        except KeyError as e:
+            self.error = e
+
+    def it_should_fail_the_command(self):
+        expect(self.error).to(be_a(KeyError))
+
+    def it_should_not_commit_the_issue(self):
+        found = self.db.get_session().execute(
+            'SELECT COUNT(*) FROM issues').scalar()
+        expect(found).to(equal(0))
+
+
+class When_a_commit_hook_fails(With_a_projected_database):
+
+    issue_id = uuid.uuid4()
+
+    def given_a_commit_hook_that_fails(self):
+        def fail(issue_ids):
+            raise KeyError()
+
+        self.db.add_commit_hook(fail)
+
+    def because_we_report_an_issue(self):
+        self.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+    def it_should_keep_the_issue_and_its_view(self):
+        view = views.view_issue(self.db.get_session, self.issue_id)
+        expect(view).to(have_keys(description='help'))
+
+
+class When_we_rebuild_the_projection(With_a_projected_database):
+
+    def given_some_issues_and_a_lost_projection(self):
+        for _ in range(5):
+            self.work_on(uuid.uuid4())
+        self.expected = self.projected()
+        session = self.db.get_session()
+        session.execute(issue_views.delete())
+        session.commit()
+
+    def because_we_rebuild_two_issues_at_a_time(self):
+        self.rebuilt = self.projection.rebuild(batch_size=2)
+
+    def it_should_rebuild_every_issue(self):
+        expect(self.rebuilt).to(equal(5))
+
+    def it_should_match_what_the_subscribers_built(self):
+        expect(self.projected()).to(equal(self.expected))
+
+    def it_should_checkpoint_the_last_issue(self):
+        position = self.db.get_session().execute(
+            select([projection_checkpoints.c.position])).scalar()
+        expect(position).to(equal(5))
+
+
+class When_we_resume_a_finished_rebuild(With_a_projected_database):
+
+    def given_a_rebuilt_projection(self):
+        self.work_on(uuid.uuid4())
+        self.projection.rebuild()
+
+    def because_we_resume_the_rebuild(self):
+        self.rebuilt = self.projection.rebuild(resume=True)
+
+    def it_should_have_nothing_left_to_do(self):
+        expect(self.rebuilt).to(equal(0))
@@ -0,0 +1,85 @@
+from functools import partial
+import os
+import tempfile
+import threading
+import uuid
+
+import sqlalchemy.exc
+
+from issues.adapters import views
+from issues.adapters.orm import SqlAlchemy
+from issues.adapters.projections import IssueViewProjection
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+from expects import expect, equal, be, be_a
+
+
+class With_separate_reader_and_writer:
+
+    issue_id = uuid.uuid4()
+    read_your_writes = 0
+
+    def given_a_database_with_a_reader_pool(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        bus = MessageBus()
+        self.db = SqlAlchemy(uri,
+                             bus,
+                             reader_uri=uri,
+                             read_your_writes=self.read_your_writes)
+        self.db.configure_mappings()
+        self.db.create_schema()
+        bus.register(
+            ReportIssue,
+            partial(services.report_issue, self.db.start_unit_of_work))
+        self.db.add_write_hook(
+            IssueViewProjection(self.db.get_session).refresh)
+        bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+
+class When_a_view_reads_from_the_reader(With_separate_reader_and_writer):
+
+    def because_we_view_the_issue_and_try_to_write(self):
+        self.view = views.view_issue(self.db.get_read_session, self.issue_id)
+        try:
+            self.db.get_read_session().execute("DELETE FROM issues")
+        except Exception as e:
+            self.error = e
+
+    def it_should_see_the_committed_issue(self):
+        expect(self.view['description']).to(equal('help'))
+
+    def it_should_not_be_able_to_write(self):
+        expect(self.error).to(be_a(sqlalchemy.exc.OperationalError))
+
+
+class When_a_client_reads_straight_after_writing(
+        With_separate_reader_and_writer):
+
+    read_your_writes = 60
+
+    def given_a_write_by_fred(self):
+        self.db.record_write('fred@example.org')
+
+    def because_fred_and_mary_ask_for_read_sessions_on_another_thread(self):
+        sessions = {}
+
+        def read():
+            for client in ['fred@example.org', 'mary@example.org']:
+                sessions[client] = self.db.get_read_session(client)
+            sessions['writer'] = self.db.get_session()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        self.sessions = sessions
+
+    def it_should_read_freds_session_from_the_writer(self):
+        expect(self.sessions['fred@example.org']).to(
+            be(self.sessions['writer']))
+
+    def it_should_read_marys_session_from_the_reader(self):
+        expect(self.sessions['mary@example.org']).not_to(
+            be(self.sessions['writer']))
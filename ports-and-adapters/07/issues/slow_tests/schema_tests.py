@@ -0,0 +1,75 @@
+import uuid
+
+import sqlalchemy
+
+from issues.adapters.orm import SqlAlchemy
+from issues.domain.ports import MessageBus
+
+from expects import expect, contain, equal
+
+LEGACY_SCHEMA = [
+    """CREATE TABLE issues (
+        pk INTEGER PRIMARY KEY,
+        issue_id CHAR(16),
+        reporter_name VARCHAR(50),
+        reporter_email VARCHAR(50),
+        description TEXT)""",
+    """CREATE TABLE assignments (
+        pk INTEGER PRIMARY KEY,
+        id CHAR(16),
+        fk_assignment_id CHAR(16) REFERENCES issues (issue_id),
+        assigned_by VARCHAR(50),
+        assigned_to VARCHAR(50))""",
+]
+
+
+class When_we_upgrade_a_database_created_without_indexes:
+
+    issue_id = uuid.uuid4()
+    unassigned_id = uuid.uuid4()
+
+    def given_a_legacy_database_with_a_reassigned_and_a_new_issue(self):
+        self.db = SqlAlchemy('sqlite://', MessageBus())
+        for ddl in LEGACY_SCHEMA:
+            self.db.engine.execute(ddl)
+        self.db.engine.execute(
+            "INSERT INTO issues (issue_id, description) VALUES (?, 'help')",
+            self.issue_id.bytes)
+        self.db.engine.execute(
+            "INSERT INTO issues (issue_id, description) VALUES (?, 'new')",
+            self.unassigned_id.bytes)
+        for engineer in ['fred', 'mary']:
+            self.db.engine.execute(
+                """INSERT INTO assignments
+                   (fk_assignment_id, assigned_to, assigned_by)
+                   VALUES (?, ?, ?)""", self.issue_id.bytes, engineer,
+                engineer)
+
+    def because_we_upgrade_the_schema(self):
+        self.db.upgrade_schema()
+        inspector = sqlalchemy.inspect(self.db.engine)
+        self.indexes = [
+            i['name'] for table in inspector.get_table_names()
+            for i in inspector.get_indexes(table)
+        ]
+        self.assignee, self.state = self.db.engine.execute(
+            "SELECT assigned_to, state FROM issues WHERE issue_id = ?",
+            self.issue_id.bytes).first()
+        self.unassigned_state = self.db.engine.execute(
+            "SELECT state FROM issues WHERE issue_id = ?",
+            self.unassigned_id.bytes).scalar()
+
+    def it_should_index_the_issue_id(self):
+        expect(self.indexes).to(contain('ix_issues_issue_id'))
+
+    def it_should_index_the_assignment_foreign_key(self):
+        expect(self.indexes).to(contain('ix_assignments_fk_assignment_id'))
+
+    def it_should_fill_in_the_current_assignee(self):
+        expect(self.assignee).to(equal('mary'))
+
+    def it_should_mark_the_assigned_issue_ready_for_work(self):
+        expect(self.state).to(equal('ReadyForWork'))
+
+    def it_should_leave_the_unassigned_issue_awaiting_triage(self):
+        expect(self.unassigned_state).to(equal('AwaitingTriage'))
@@ -0,0 +1,61 @@
+from functools import partial
+import os
+import tempfile
+import uuid
+
+from issues.adapters.executors import ShardedExecutor
+from issues.adapters.orm import SqlAlchemy
+from issues.domain.messages import ReportIssue, TriageIssue, IssuePriority
+from issues.domain.ports import MessageBus, IssueNotFoundException
+from issues import services
+
+from expects import expect, equal, be_a
+
+
+def file_bus(uri):
+    bus = MessageBus()
+    db = SqlAlchemy(uri, bus)
+    db.configure_mappings()
+    bus.register(ReportIssue, partial(services.report_issue,
+                                      db.start_unit_of_work))
+    bus.register(TriageIssue, partial(services.triage_issue,
+                                      db.start_unit_of_work))
+    return bus
+
+
+class When_commands_are_run_on_a_sharded_executor:
+
+    issue_ids = [uuid.uuid4() for _ in range(8)]
+
+    def given_a_file_database(self):
+        uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'issues.db')
+        self.db = SqlAlchemy(uri, MessageBus())
+        self.db.configure_mappings()
+        self.db.create_schema()
+        self.make_bus = partial(file_bus, uri)
+
+    def because_we_report_and_triage_issues_and_triage_a_missing_one(self):
+        with ShardedExecutor(self.make_bus, shards=4) as executor:
+            triaged = []
+            for issue_id in self.issue_ids:
+                executor.submit(
+                    ReportIssue(issue_id, 'fred', 'fred@example.org',
+                                'the printer is sad'))
+                triaged.append(executor.submit(
+                    TriageIssue(issue_id, 'printers', IssuePriority.Low)))
+            missing = executor.submit(
+                TriageIssue(uuid.uuid4(), 'printers', IssuePriority.Low))
+
+            self.triaged = [f.result() for f in triaged]
+            self.error = missing.exception()
+
+    def it_should_handle_commands_for_an_issue_in_order(self):
+        expect(self.triaged).to(equal([None] * len(self.issue_ids)))
+
+    def it_should_return_errors_through_the_future(self):
+        expect(self.error).to(be_a(IssueNotFoundException))
+
+    def it_should_write_to_the_shared_database(self):
+        with self.db.start_unit_of_work() as tx:
+            for issue_id in self.issue_ids:
+                expect(tx.issues.get(issue_id).category).to(equal('printers'))
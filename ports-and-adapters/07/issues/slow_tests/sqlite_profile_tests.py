@@ -0,0 +1,69 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from issues.adapters.orm import SqlAlchemy, SqliteProfile, RetryPolicy
+from issues.domain.messages import ReportIssue
+from issues.domain.ports import MessageBus
+from issues import services
+
+from expects import expect, equal
+
+
+class With_a_tuned_sqlite_file:
+
+    def given_a_tuned_database(self):
+        path = os.path.join(tempfile.mkdtemp(), 'issues.db')
+        profile = SqliteProfile(
+            busy_timeout=0,
+            retry=RetryPolicy(attempts=20, base_delay=0.01, max_delay=0.1))
+        self.db = SqlAlchemy('sqlite:///' + path, MessageBus(),
+                             sqlite_profile=profile)
+        self.db.configure_mappings()
+        self.db.create_schema()
+
+
+class When_we_connect_with_the_sqlite_profile(With_a_tuned_sqlite_file):
+
+    def because_we_read_the_pragmas(self):
+        with self.db.engine.connect() as conn:
+            self.journal_mode = conn.execute('PRAGMA journal_mode').scalar()
+            self.synchronous = conn.execute('PRAGMA synchronous').scalar()
+
+    def it_should_use_write_ahead_logging(self):
+        expect(self.journal_mode).to(equal('wal'))
+
+    def it_should_use_normal_synchronous_mode(self):
+        expect(self.synchronous).to(equal(1))
+
+
+class When_another_connection_holds_the_write_lock(With_a_tuned_sqlite_file):
+
+    issue_id = uuid.uuid4()
+
+    def given_a_writer_that_holds_the_lock_briefly(self):
+        locked = threading.Event()
+
+        def hold_lock():
+            conn = self.db.engine.raw_connection()
+            conn.execute('BEGIN IMMEDIATE')
+            locked.set()
+            time.sleep(0.2)
+            conn.execute('COMMIT')
+            conn.close()
+
+        self.writer = threading.Thread(target=hold_lock)
+        self.writer.start()
+        locked.wait(1)
+
+    def because_we_report_an_issue(self):
+        services.report_issue(
+            self.db.start_unit_of_work,
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+        self.writer.join()
+
+    def it_should_retry_until_it_gets_the_lock(self):
+        with self.db.start_unit_of_work() as tx:
+            expect(tx.issues.get(self.issue_id).description).to(equal('help'))
@@ -0,0 +1,52 @@
+import uuid
+
+from issues.adapters import config
+from issues.domain.messages import (ReportIssue, TriageIssue, IssuePriority,
+                                    IssueState)
+from issues.domain.ports import IssueNotFoundException
+
+from expects import expect, equal, be_a
+
+
+class When_we_start_many_units_of_work:
+
+    def given_a_database(self):
+        self.db = config.db
+
+    def because_we_start_and_commit_a_hundred_units_of_work(self):
+        for _ in range(100):
+            with self.db.start_unit_of_work() as tx:
+                tx.commit()
+
+    def it_should_have_a_single_flush_listener(self):
+        session = self.db.get_session()
+        expect(len(session.dispatch.after_flush)).to(equal(1))
+
+
+class When_a_batch_fails_before_another_command_on_the_thread:
+
+    issue_id = uuid.uuid4()
+
+    def given_a_reported_issue(self):
+        config.bus.handle(
+            ReportIssue(self.issue_id, 'fred', 'fred@example.org', 'help'))
+
+    def because_a_batch_with_a_missing_issue_fails_and_we_report_another(self):
+        try:
+            config.bus.handle_many([
+                TriageIssue(self.issue_id, 'cat', IssuePriority.High),
+                TriageIssue(uuid.uuid4(), 'cat', IssuePriority.High)
+            ])
+        except IssueNotFoundException as e:
+            self.error = e
+        config.bus.handle(
+            ReportIssue(uuid.uuid4(), 'mary', 'mary@example.org', 'help'))
+        config.db.remove_session()
+
+    def it_should_raise_the_error(self):
+        expect(self.error).to(be_a(IssueNotFoundException))
+
+    def it_should_not_persist_any_of_the_failed_batch(self):
+        with config.db.start_unit_of_work() as tx:
+            issue = tx.issues.get(self.issue_id)
+            expect(issue.state).to(equal(IssueState.AwaitingTriage))